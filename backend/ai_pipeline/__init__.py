@@ -1,3 +1,10 @@
-from .data_fetcher import fetch_and_preprocess, ArticleFetcher
+from importlib import import_module
 
 __all__ = ['fetch_and_preprocess', 'ArticleFetcher']
+
+def __getattr__(name):
+    # Imported on first use, so the API (which only needs model_registry)
+    # does not pull in newsapi through data_fetcher
+    if name in __all__:
+        return getattr(import_module('.data_fetcher', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,46 @@
-from sentence_transformers import SentenceTransformer
-import spacy
 from typing import Dict, List
 import numpy as np
 
+try:
+    from .model_registry import registry
+except ImportError:  # imported as a top-level module by the scripts in this folder
+    from model_registry import registry
+
+# spaCy components needed for entities (ner) and noun chunks (tagger, parser);
+# everything else, e.g. the lemmatizer, is skipped
+NLP_COMPONENTS = ('tok2vec', 'tagger', 'attribute_ruler', 'parser', 'ner')
+
+# Bump whenever entity/keyword extraction changes, so stored analyses are redone
+ANALYZER_VERSION = 1
+
 class ArticleAnalyzer:
     """Analyzes articles and extracts AI features"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        embedding_model: str = 'all-MiniLM-L6-v2',
+        spacy_model: str = 'en_core_web_sm',
+        embedding_backend: str = 'torch',
+        onnx_file: str = None,
+        analysis_cache=None
+    ):
+        """
+        analysis_cache: optional store of past results (e.g. the backend's
+        AnalysisCache) with key/get_many/put_many, so analyze_batch skips
+        spaCy for texts analyzed on an earlier run. From the backend, use
+        analysis_cache.create_article_analyzer(), which builds one with an
+        AnalysisCache and the models set in Config.
+        """
         print("🤖 Loading AI models...")
-        # Load sentence transformer for embeddings
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-        # Load spaCy for entity extraction
-        self.nlp = spacy.load('en_core_web_sm')
+        # Sentence transformer for embeddings (shared with SemanticMatcher via the registry)
+        # embedding_backend: 'torch', 'onnx' or 'int8' (see ModelRegistry.sentence_transformer)
+        self.embedder = registry.sentence_transformer(embedding_model, embedding_backend, onnx_file)
+        # spaCy for entity extraction
+        self.nlp = registry.spacy(spacy_model)
+        self.unused_pipes = [name for name in self.nlp.pipe_names if name not in NLP_COMPONENTS]
+        spacy_version = getattr(self.nlp, 'meta', {}).get('version', '')
+        self.version = f"{ANALYZER_VERSION}/{spacy_model}-{spacy_version}"
+        self.analysis_cache = analysis_cache
         print("✅ AI models loaded")
     
     def analyze_article(self, article: Dict) -> Dict:
@@ -31,7 +60,7 @@ class ArticleAnalyzer:
         )
         
         # Extract named entities
-        doc = self.nlp(article['full_text'])
+        doc = self.nlp(article['full_text'], disable=self.unused_pipes)
         entities = self._extract_entities(doc)
         
         # Extract keywords (noun phrases)
@@ -71,28 +100,72 @@ class ArticleAnalyzer:
         
         return keywords
     
-    def analyze_batch(self, articles: List[Dict]) -> List[Dict]:
+    def analyze_batch(
+        self,
+        articles: List[Dict],
+        batch_size: int = 64,
+        n_process: int = 1
+    ) -> List[Dict]:
         """
         Analyze multiple articles
         
+        All texts are embedded in one encode call, and spaCy streams the
+        documents through nlp.pipe with only the components it needs.
+        With an analysis_cache, texts analyzed on earlier runs skip spaCy.
+        
         Args:
             articles: List of article dicts
+            batch_size: Texts per encode/nlp.pipe batch
+            n_process: spaCy worker processes (use >1 for thousands of articles)
         
         Returns:
             List of analyzed articles with AI features
         """
         print(f"🔬 Analyzing {len(articles)} articles with AI...")
-        
-        analyzed = []
-        for i, article in enumerate(articles, 1):
-            if i % 10 == 0:
-                print(f"  Progress: {i}/{len(articles)}")
+        if not articles:
+            return []
+        
+        texts = [article['full_text'] for article in articles]
+        embeddings = self.embedder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        for article, embedding in zip(articles, embeddings):
+            article['embedding'] = embedding
+        
+        # Reuse stored entities/keywords; only new texts go through spaCy
+        stored, keys = {}, []
+        if self.analysis_cache is not None:
+            keys = [self.analysis_cache.key(self.version, text) for text in texts]
+            stored = self.analysis_cache.get_many(keys)
+        pending = []
+        for i, article in enumerate(articles):
+            if keys and keys[i] in stored:
+                article['entities'] = stored[keys[i]]['entities']
+                article['keywords'] = stored[keys[i]]['keywords']
+            else:
+                pending.append(i)
+        if stored:
+            print(f"  Reused {len(articles) - len(pending)} stored analyses")
+        
+        docs = self.nlp.pipe(
+            (texts[i] for i in pending),
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self.unused_pipes
+        )
+        new_results = {}
+        for done, (i, doc) in enumerate(zip(pending, docs), 1):
+            if done % 100 == 0:
+                print(f"  Progress: {done}/{len(pending)}")
             
-            analyzed_article = self.analyze_article(article)
-            analyzed.append(analyzed_article)
+            articles[i]['entities'] = self._extract_entities(doc)
+            articles[i]['keywords'] = self._extract_keywords(doc)
+            if keys:
+                new_results[keys[i]] = {'entities': articles[i]['entities'], 'keywords': articles[i]['keywords']}
+        
+        if new_results:
+            self.analysis_cache.put_many(self.version, new_results)
         
         print(f"✅ Analysis complete!")
-        return analyzed
+        return articles
     
     def calculate_similarity(self, article1: Dict, article2: Dict) -> float:
         """
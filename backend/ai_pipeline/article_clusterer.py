@@ -1,7 +1,18 @@
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import AgglomerativeClustering
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+try:
+    from .vectors import l2_normalize
+except ImportError:  # imported as a top-level module by the scripts in this folder
+    from vectors import l2_normalize
+
+# 'auto' switches from agglomerative to the sparse graph above this many articles
+GRAPH_MIN_ARTICLES = 5000
+
+# Similarity scores held in memory at once while building the kNN graph (~128 MB of float32)
+GRAPH_BLOCK_ELEMENTS = 32 * 1024 * 1024
 
 class ArticleClusterer:
     """Clusters articles by semantic similarity"""
@@ -10,7 +21,9 @@ class ArticleClusterer:
         self,
         similarity_threshold: float = 0.5,
         min_cluster_size: int = 3,
-        max_cluster_size: int = 25
+        max_cluster_size: int = 25,
+        method: str = 'auto',
+        n_neighbors: int = 15
     ):
         """
         Initialize clusterer
@@ -19,10 +32,18 @@ class ArticleClusterer:
             similarity_threshold: Min similarity for same cluster (0-1)
             min_cluster_size: Minimum articles per cluster
             max_cluster_size: Maximum articles per cluster
+            method: 'agglomerative' (dense n x n, exact average linkage),
+                'graph' (sparse mutual kNN graph, scales to 100k+ articles)
+                or 'auto' (graph above GRAPH_MIN_ARTICLES articles)
+            n_neighbors: Neighbours per article in graph mode
         """
+        if method not in ('auto', 'agglomerative', 'graph'):
+            raise ValueError(f"Unknown clustering method '{method}'")
         self.similarity_threshold = similarity_threshold
         self.min_cluster_size = min_cluster_size
         self.max_cluster_size = max_cluster_size
+        self.method = method
+        self.n_neighbors = n_neighbors
     
     def cluster_articles(self, articles: List[Dict]) -> List[Dict]:
         """
@@ -47,6 +68,23 @@ class ArticleClusterer:
         # Extract embeddings
         embeddings = np.array([article['embedding'] for article in articles])
         
+        if self.method == 'graph' or (self.method == 'auto' and len(articles) > GRAPH_MIN_ARTICLES):
+            labels = self._graph_labels(embeddings)
+        else:
+            labels = self._agglomerative_labels(embeddings)
+        
+        # Group articles by cluster
+        clusters = self._group_by_cluster(articles, labels)
+        
+        # Filter and validate clusters
+        clusters = self._filter_clusters(clusters)
+        
+        print(f"✅ Created {len(clusters)} clusters")
+        
+        return clusters
+    
+    def _agglomerative_labels(self, embeddings: np.ndarray) -> np.ndarray:
+        """Average-linkage clustering on the dense distance matrix (O(n²) memory)"""
         # Calculate similarity matrix
         similarity_matrix = cosine_similarity(embeddings)
         
@@ -63,17 +101,64 @@ class ArticleClusterer:
             linkage='average'
         )
         
-        labels = clustering.fit_predict(distance_matrix)
+        return clustering.fit_predict(distance_matrix)
+    
+    def _graph_labels(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Connected components of the mutual k-nearest-neighbour graph
         
-        # Group articles by cluster
-        clusters = self._group_by_cluster(articles, labels)
+        Each article keeps its n_neighbors most similar articles above
+        similarity_threshold, and an edge survives only if both ends chose
+        each other, which stops long chains from merging unrelated stories.
+        Similarities are computed in row blocks, so memory is bounded by
+        GRAPH_BLOCK_ELEMENTS plus the O(n * n_neighbors) sparse graph.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
         
-        # Filter and validate clusters
-        clusters = self._filter_clusters(clusters)
+        n = len(embeddings)
+        vectors = l2_normalize(embeddings)
         
-        print(f"✅ Created {len(clusters)} clusters")
+        k = min(self.n_neighbors, n - 1)
+        if k < 1:
+            return np.arange(n)
+        block = max(1, GRAPH_BLOCK_ELEMENTS // n)
+        rows, cols, weights = [], [], []
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            sims = vectors[start:stop] @ vectors.T
+            sims[np.arange(stop - start), np.arange(start, stop)] = -1.0  # no self-edges
+            block_rows, block_cols, block_sims = self._top_k_above_threshold(sims, k)
+            rows.append(block_rows + start)
+            cols.append(block_cols)
+            weights.append(block_sims)
         
-        return clusters
+        graph = csr_matrix(
+            (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, n)
+        )
+        mutual = graph.minimum(graph.T)
+        _, labels = connected_components(mutual, directed=False)
+        return labels
+    
+    def _top_k_above_threshold(self, sims: np.ndarray, k: int):
+        """(row, col, similarity) of each row's k best entries that reach similarity_threshold"""
+        above = sims >= self.similarity_threshold
+        if np.count_nonzero(above) > 4 * k * len(sims):
+            # Dense block (low threshold): partial sort every row
+            neighbors = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            neighbor_sims = np.take_along_axis(sims, neighbors, axis=1)
+            keep = neighbor_sims >= self.similarity_threshold
+            return np.nonzero(keep)[0], neighbors[keep], neighbor_sims[keep]
+        
+        # Usual case: few candidates per row, so rank only those
+        rows, cols = np.nonzero(above)
+        values = sims[rows, cols]
+        order = np.lexsort((-values, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = rank < k
+        return rows[keep], cols[keep], values[keep]
     
     def _group_by_cluster(self, articles: List[Dict], labels: np.ndarray) -> List[Dict]:
         """Group articles by cluster label"""
@@ -130,14 +215,286 @@ class ArticleClusterer:
         if len(articles) < 2:
             return 1.0
         
-        # Get all embeddings
-        embeddings = np.array([a['embedding'] for a in articles])
-        
-        # Calculate pairwise similarities
-        similarities = cosine_similarity(embeddings)
-        
-        # Average similarity (excluding diagonal)
+        # Mean pairwise cosine (excluding the diagonal) from the sum of unit
+        # vectors: sum_ij v_i.v_j = |sum_i v_i|^2, so this is O(n*d)
+        vector_sum = l2_normalize([a['embedding'] for a in articles]).sum(axis=0)
         n = len(articles)
-        total_similarity = (similarities.sum() - n) / (n * (n - 1))
+        total_similarity = (float(vector_sum @ vector_sum) - n) / (n * (n - 1))
         
         return float(total_similarity)
+    
+    def cluster_stats(self, clusters: List[Dict]) -> List[Dict]:
+        """
+        Statistics for every cluster in one vectorized pass, O(total articles * d)
+        plus O(clusters^2) for the nearest-cluster search
+        
+        Args:
+            clusters: Clusters as returned by cluster_articles
+        
+        Returns:
+            One dict per non-empty cluster, in order:
+                cluster_id, size, coherence (as calculate_cluster_coherence),
+                centroid (unit vector), representative (the medoid article,
+                i.e. highest mean similarity to the rest of its cluster),
+                spread (mean cosine distance to the centroid), and
+                nearest_cluster_id / nearest_cluster_similarity (by centroid)
+        """
+        clusters = [cluster for cluster in clusters if cluster['articles']]
+        if not clusters:
+            return []
+        
+        sizes = np.array([len(cluster['articles']) for cluster in clusters])
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        vectors = l2_normalize([a['embedding'] for cluster in clusters for a in cluster['articles']])
+        labels = np.repeat(np.arange(len(clusters)), sizes)
+        
+        sums = np.add.reduceat(vectors, starts, axis=0)
+        sq_norms = np.einsum('ij,ij->i', sums, sums)
+        pairs = np.maximum(sizes * (sizes - 1), 1)
+        coherence = np.where(sizes > 1, (sq_norms - sizes) / pairs, 1.0)
+        centroids = l2_normalize(sums)
+        
+        # Each article's similarity to its own cluster: to the centroid, and to the sum
+        # (v_i.sum - 1 is its total similarity to the other members, so the max is the medoid)
+        to_sum = np.einsum('ij,ij->i', vectors, sums[labels])
+        to_centroid = np.einsum('ij,ij->i', vectors, centroids[labels])
+        spread = 1 - np.add.reduceat(to_centroid, starts) / sizes
+        medoids = [int(start + np.argmax(to_sum[start:start + size])) for start, size in zip(starts, sizes)]
+        
+        nearest = np.full(len(clusters), -1)
+        nearest_sims = np.full(len(clusters), np.nan)
+        if len(clusters) > 1:
+            block = max(1, GRAPH_BLOCK_ELEMENTS // len(clusters))
+            for start in range(0, len(clusters), block):
+                sims = centroids[start:start + block] @ centroids.T
+                sims[np.arange(len(sims)), np.arange(start, start + len(sims))] = -np.inf
+                nearest[start:start + block] = np.argmax(sims, axis=1)
+                nearest_sims[start:start + block] = sims[np.arange(len(sims)), nearest[start:start + block]]
+        
+        all_articles = [a for cluster in clusters for a in cluster['articles']]
+        stats = []
+        for i, cluster in enumerate(clusters):
+            stats.append({
+                'cluster_id': cluster['cluster_id'],
+                'size': int(sizes[i]),
+                'coherence': float(coherence[i]),
+                'centroid': centroids[i],
+                'representative': all_articles[medoids[i]],
+                'spread': float(spread[i]),
+                'nearest_cluster_id': clusters[nearest[i]]['cluster_id'] if nearest[i] >= 0 else None,
+                'nearest_cluster_similarity': float(nearest_sims[i]) if nearest[i] >= 0 else None
+            })
+        return stats
+
+
+def _bisect(vectors: np.ndarray, max_size: int, iterations: int = 10) -> List[np.ndarray]:
+    """
+    Split unit vectors into groups of at most max_size by repeated spherical
+    2-means. Returns index arrays into vectors.
+    """
+    pending, groups = [np.arange(len(vectors))], []
+    while pending:
+        indices = pending.pop()
+        if len(indices) <= max_size:
+            groups.append(indices)
+            continue
+        
+        members = vectors[indices]
+        # Seed with the member least similar to the mean and the one least similar to that
+        first = int(np.argmin(members @ members.mean(axis=0)))
+        second = int(np.argmin(members @ members[first]))
+        centroids = members[[first, second]]
+        for _ in range(iterations):
+            assign = np.argmax(members @ centroids.T, axis=1)
+            if assign.min() == assign.max():
+                break
+            centroids = l2_normalize(np.vstack([members[assign == c].sum(axis=0) for c in (0, 1)]))
+        if assign.min() == assign.max():
+            # Identical vectors can't be separated by similarity, so cut in half
+            assign = np.arange(len(indices)) >= len(indices) // 2
+        pending.append(indices[assign == 0])
+        pending.append(indices[assign == 1])
+    return groups
+
+
+class MemoryClusterStore:
+    """
+    In-process storage for IncrementalClusterer.
+    The backend's ClusterStore implements the same methods on top of the
+    story_clusters tables, so clusters survive between runs.
+    """
+    
+    def __init__(self):
+        self.clusters = {}  # cluster_id -> (centroid, member_count)
+        self.members = {}  # article key -> (cluster_id, vector)
+    
+    def load(self) -> Dict[int, Tuple[np.ndarray, int]]:
+        return dict(self.clusters)
+    
+    def existing_members(self, keys: List[str]) -> Dict[str, int]:
+        return {key: self.members[key][0] for key in keys if key in self.members}
+    
+    def cluster_members(self, cluster_id: int) -> Tuple[List[str], np.ndarray]:
+        keys = [key for key, (cid, _) in self.members.items() if cid == cluster_id]
+        return keys, np.array([self.members[key][1] for key in keys])
+    
+    def save(self, clusters: Dict[int, Tuple[np.ndarray, int]], members: Dict[str, Tuple[int, np.ndarray]]) -> None:
+        """Upsert cluster centroids/counts and add or move member articles"""
+        self.clusters.update(clusters)
+        for key, (cluster_id, vector) in members.items():
+            if vector is None:
+                vector = self.members[key][1]
+            self.members[key] = (cluster_id, vector)
+
+
+class IncrementalClusterer:
+    """
+    Online story clustering: each new article joins the most similar existing
+    cluster centroid (if above similarity_threshold) or starts a new cluster,
+    at O(clusters) cost per article. Centroids and member counts are kept in a
+    store, so clusters persist and grow across runs; clusters that outgrow
+    max_cluster_size are split by repeated 2-means over their members.
+    
+    A single writer per store is assumed (cluster ids are allocated here).
+    """
+    
+    def __init__(
+        self,
+        similarity_threshold: float = 0.5,
+        max_cluster_size: int = 25,
+        store=None
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_cluster_size = max_cluster_size
+        self.store = store if store is not None else MemoryClusterStore()
+        
+        saved = self.store.load()
+        self.cluster_ids = list(saved)
+        self.counts = np.array([saved[cid][1] for cid in self.cluster_ids], dtype=np.int64)
+        # Sums of member unit vectors: centroid = sum / count, and updates are O(dim)
+        self.sums = np.array([saved[cid][0] * saved[cid][1] for cid in self.cluster_ids], dtype=np.float32)
+        self.next_id = max(self.cluster_ids, default=0) + 1
+        self._row = {cid: row for row, cid in enumerate(self.cluster_ids)}
+    
+    def __len__(self) -> int:
+        return len(self.cluster_ids)
+    
+    def add_articles(self, articles: List[Dict], key: str = 'url') -> List[Dict]:
+        """
+        Assign articles (with embeddings) to clusters and persist the result.
+        Articles already clustered on an earlier run keep their cluster.
+        Sets article['cluster_id'] and returns the touched clusters in the
+        cluster_articles format, where 'articles' are this batch's members
+        and 'size' is the cluster's total member count.
+        """
+        if not articles:
+            return []
+        
+        keys = [article[key] for article in articles]
+        known = self.store.existing_members(keys)
+        vectors = l2_normalize(np.array([article['embedding'] for article in articles]))
+        new_members = {}
+        
+        for article, article_key, vector in zip(articles, keys, vectors):
+            if article_key in known:
+                article['cluster_id'] = known[article_key]
+                continue
+            if article_key in new_members:
+                article['cluster_id'] = new_members[article_key][0]
+                continue
+            
+            row = self._nearest(vector)
+            if row is None:
+                row = self._new_cluster(vector)
+            else:
+                self.sums[row] += vector
+                self.counts[row] += 1
+            article['cluster_id'] = self.cluster_ids[row]
+            new_members[article_key] = (article['cluster_id'], vector)
+        
+        touched = {cid for cid, _ in new_members.values()}
+        self.store.save({cid: self._cluster_state(cid) for cid in touched}, new_members)
+        
+        split_ids = self.split_oversized(touched)
+        if split_ids:
+            # Members of split clusters may have moved
+            moved = self.store.existing_members(keys)
+            for article, article_key in zip(articles, keys):
+                article['cluster_id'] = moved.get(article_key, article['cluster_id'])
+        
+        print(f"✅ Assigned {len(new_members)} new articles; {len(self)} clusters total")
+        return self._group(articles)
+    
+    def split_oversized(self, cluster_ids=None) -> List[int]:
+        """
+        Split clusters (all, or just cluster_ids) holding more than
+        max_cluster_size members. Returns the ids of the resulting clusters.
+        """
+        candidates = self.cluster_ids if cluster_ids is None else list(cluster_ids)
+        oversized = [cid for cid in candidates if self.counts[self._row[cid]] > self.max_cluster_size]
+        created = []
+        for cluster_id in oversized:
+            member_keys, member_vectors = self.store.cluster_members(cluster_id)
+            if len(member_keys) <= self.max_cluster_size:
+                continue
+            member_vectors = l2_normalize(member_vectors)
+            groups = _bisect(member_vectors, self.max_cluster_size)
+            
+            # The largest part keeps the original id
+            groups.sort(key=len, reverse=True)
+            moves, new_ids = {}, [cluster_id]
+            self._set_cluster(self._row[cluster_id], member_vectors[groups[0]])
+            for group in groups[1:]:
+                row = self._new_cluster(member_vectors[group[0]])
+                self._set_cluster(row, member_vectors[group])
+                new_ids.append(self.cluster_ids[row])
+                for i in group:
+                    moves[member_keys[i]] = (self.cluster_ids[row], None)
+            self.store.save({cid: self._cluster_state(cid) for cid in new_ids}, moves)
+            created.extend(new_ids)
+            print(f"  ✂️ Split cluster {cluster_id} ({len(member_keys)} articles) into {len(groups)}")
+        return created
+    
+    def centroids(self) -> Tuple[List[int], np.ndarray]:
+        """Cluster ids and their normalized centroids"""
+        return list(self.cluster_ids), l2_normalize(self.sums) if len(self.sums) else self.sums
+    
+    def _nearest(self, vector: np.ndarray):
+        if not self.cluster_ids:
+            return None
+        # Cosine to each centroid: (sum . v) / |sum|
+        norms = np.linalg.norm(self.sums, axis=1)
+        norms[norms == 0] = 1.0
+        scores = (self.sums @ vector) / norms
+        row = int(np.argmax(scores))
+        return row if scores[row] >= self.similarity_threshold else None
+    
+    def _new_cluster(self, vector: np.ndarray) -> int:
+        cluster_id = self.next_id
+        self.next_id += 1
+        self.cluster_ids.append(cluster_id)
+        self._row[cluster_id] = len(self.cluster_ids) - 1
+        self.sums = np.vstack([self.sums.reshape(-1, len(vector)), vector[None, :]])
+        self.counts = np.append(self.counts, 1)
+        return len(self.cluster_ids) - 1
+    
+    def _set_cluster(self, row: int, member_vectors: np.ndarray) -> None:
+        self.sums[row] = member_vectors.sum(axis=0)
+        self.counts[row] = len(member_vectors)
+    
+    def _cluster_state(self, cluster_id: int) -> Tuple[np.ndarray, int]:
+        row = self._row[cluster_id]
+        return self.sums[row] / max(1, self.counts[row]), int(self.counts[row])
+    
+    def _group(self, articles: List[Dict]) -> List[Dict]:
+        grouped = {}
+        for article in articles:
+            grouped.setdefault(article['cluster_id'], []).append(article)
+        return [
+            {
+                'cluster_id': int(cluster_id),
+                'articles': cluster_articles,
+                'size': int(self.counts[self._row[cluster_id]])
+            }
+            for cluster_id, cluster_articles in grouped.items()
+        ]
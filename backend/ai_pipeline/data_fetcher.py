@@ -1,13 +1,75 @@
 from newsapi import NewsApiClient
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Set, Union
 import hashlib
+import math
+import os
+
+try:
+    from .near_duplicates import NearDuplicateIndex
+    from .pattern_matcher import PatternMatcher
+except ImportError:  # imported as a top-level module by the scripts in this folder
+    from near_duplicates import NearDuplicateIndex
+    from pattern_matcher import PatternMatcher
+
+# Phrase lists for the quality filter, by category. Extend these (or pass
+# spam_patterns as a dict or a JSON file path) freely: matching is one pass per article.
+DEFAULT_SPAM_PATTERNS = {
+    'spam': [
+        'click here', 'buy now', 'limited time', 'act now',
+        'subscribe now', 'sign up today', 'special offer',
+        'free download', 'earn money'
+    ],
+    'blocklist': []
+}
+
+# An article is rejected once a category reaches this many distinct phrases
+DEFAULT_SPAM_LIMITS = {'spam': 2, 'blocklist': 1}
+
+# MinHash index file for fetch_and_preprocess and stream_topic; the same
+# NEAR_DUPLICATE_PATH setting as the backend's Config ('' keeps it in memory)
+DEFAULT_NEAR_DUPLICATE_PATH = os.getenv(
+    'NEAR_DUPLICATE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'near_duplicates.db')
+) or None
 
 class ArticleFetcher:
     """Fetches and preprocesses articles from News API"""
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        near_duplicate_threshold: Optional[float] = 0.6,
+        near_duplicate_path: Optional[str] = None,
+        spam_patterns: Optional[Union[Dict[str, List[str]], str]] = None,
+        spam_limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            api_key: News API key
+            near_duplicate_threshold: Estimated Jaccard similarity (character
+                5-grams of title + description) at which an article counts as
+                a near-duplicate of one already seen; None disables the check
+            near_duplicate_path: SQLite file that keeps the MinHash index
+                across runs (in memory for this fetcher only if unset)
+            spam_patterns: {category: [phrases]} for the quality filter, or
+                the path of a JSON file holding one (DEFAULT_SPAM_PATTERNS if unset)
+            spam_limits: {category: distinct matches that reject an article}
+        """
         self.newsapi = NewsApiClient(api_key=api_key)
+        self.near_duplicates = None
+        if near_duplicate_threshold is not None:
+            self.near_duplicates = NearDuplicateIndex(
+                threshold=near_duplicate_threshold,
+                path=near_duplicate_path
+            )
+        # Compiled once; each article is then scanned in a single pass
+        if isinstance(spam_patterns, str):
+            self.spam_matcher = PatternMatcher.from_file(spam_patterns)
+        else:
+            self.spam_matcher = PatternMatcher(spam_patterns or DEFAULT_SPAM_PATTERNS)
+        self.spam_limits = spam_limits or DEFAULT_SPAM_LIMITS
     
     def fetch_articles(
         self, 
@@ -26,6 +88,15 @@ class ArticleFetcher:
         Returns:
             List of article dictionaries
         """
+        if count > 100:
+            # More than one page: deep fetch, stopping once we have enough
+            articles = []
+            for page in self.iter_article_pages(query, pages=math.ceil(count / 100), days_back=days_back):
+                articles.extend(page[:count - len(articles)])
+                if len(articles) >= count:
+                    break
+            return articles
+        
         print(f"🔍 Fetching {count} articles for '{query}'...")
         
         try:
@@ -50,17 +121,101 @@ class ArticleFetcher:
             print(f"❌ Error fetching articles: {e}")
             return []
     
-    def preprocess_articles(self, articles: List[Dict]) -> List[Dict]:
+    def iter_article_pages(
+        self,
+        query: str,
+        pages: int = 5,
+        page_size: int = 100,
+        days_back: int = 7,
+        max_workers: int = 4,
+        max_requests: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Deep fetch: several pages of results, requested concurrently
+        
+        Page 1 comes first (it reports how many results exist), then the
+        remaining pages are fetched in parallel and yielded as each arrives,
+        without URLs already returned on another page.
+        
+        Args:
+            query: Search query (topic name)
+            pages: Max pages to fetch
+            page_size: Articles per page (News API allows up to 100)
+            days_back: How far back to search
+            max_workers: Concurrent page requests
+            max_requests: Request budget for this fetch (default: pages)
+        
+        Yields:
+            Raw News API articles, one list per page
+        """
+        if max_requests is not None:
+            pages = min(pages, max_requests)
+        if pages < 1:
+            return
+        from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        seen_urls = set()
+        
+        def fetch_page(page: int) -> Dict:
+            try:
+                return self.newsapi.get_everything(
+                    q=query,
+                    language='en',
+                    sort_by='relevancy',
+                    from_param=from_date,
+                    page_size=page_size,
+                    page=page
+                )
+            except Exception as e:
+                # e.g. the plan's result limit was reached on a later page
+                print(f"❌ Error fetching page {page}: {e}")
+                return {}
+        
+        def unseen(response: Dict) -> List[Dict]:
+            fresh = [a for a in response.get('articles', []) if a.get('url') and a['url'] not in seen_urls]
+            seen_urls.update(a['url'] for a in fresh)
+            return fresh
+        
+        print(f"🔍 Deep fetching up to {pages} pages for '{query}'...")
+        first = fetch_page(1)
+        yield unseen(first)
+        total = first.get('totalResults', 0)
+        last_page = min(pages, math.ceil(total / page_size))
+        if last_page < 2:
+            return
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_page, page) for page in range(2, last_page + 1)]
+            try:
+                for future in as_completed(futures):
+                    yield unseen(future.result())
+            finally:
+                for future in futures:
+                    future.cancel()
+        print(f"✅ Deep fetch returned {len(seen_urls)} unique articles")
+    
+    def preprocess_articles(
+        self,
+        articles: List[Dict],
+        seen_urls: Optional[Set[str]] = None,
+        seen_content_hashes: Optional[Set[str]] = None
+    ) -> List[Dict]:
         """
         Clean and preprocess raw articles
         
         Removes duplicates, filters low-quality, standardizes format
+        
+        Args:
+            articles: Raw News API articles
+            seen_urls, seen_content_hashes: Pass the same sets to every call
+                over one stream of batches, so a duplicate in a later batch
+                is dropped too (fresh sets per call if unset)
         """
         print(f"🧹 Preprocessing {len(articles)} articles...")
         
         processed = []
-        seen_urls = set()
-        seen_content_hashes = set()
+        seen_urls = set() if seen_urls is None else seen_urls
+        seen_content_hashes = set() if seen_content_hashes is None else seen_content_hashes
+        near_duplicate_count = 0
         
         for article in articles:
             # Skip if missing critical fields
@@ -84,6 +239,12 @@ class ArticleFetcher:
                 continue
             seen_content_hashes.add(content_hash)
             
+            # Skip near-duplicates (e.g. lightly edited wire copies) of articles kept
+            # this run or earlier ones; kept articles are indexed by filter_by_quality
+            if self.near_duplicates is not None and self.near_duplicates.query(content, exclude_key=url):
+                near_duplicate_count += 1
+                continue
+            
             # Create cleaned article
             cleaned = {
                 'title': article['title'].strip(),
@@ -99,9 +260,32 @@ class ArticleFetcher:
             
             processed.append(cleaned)
         
+        if self.near_duplicates is not None:
+            print(f"  Dropped {near_duplicate_count} near-duplicates")
         print(f"✅ Kept {len(processed)} unique, quality articles")
         return processed
     
+    def remember_articles(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Add kept articles to the near-duplicate index (and its file, if any),
+        dropping any that near-duplicate one added before them
+        
+        filter_by_quality calls this on the articles it keeps, so rejected
+        articles never suppress a later copy; call it directly when the
+        quality filter is skipped.
+        """
+        if self.near_duplicates is None:
+            return articles
+        
+        kept = [
+            article for article in articles
+            if not self.near_duplicates.check_and_add(
+                article['url'], f"{article['title']} {article['description']}"
+            )
+        ]
+        self.near_duplicates.flush()
+        return kept
+    
     def _hash_content(self, text: str) -> str:
         """Generate hash for duplicate detection"""
         normalized = text.lower().strip()
@@ -148,29 +332,51 @@ class ArticleFetcher:
             
             filtered.append(article)
         
+        filtered = self.remember_articles(filtered)
         print(f"✅ {len(filtered)} articles passed quality filter ({len(articles) - len(filtered)} filtered out)")
         return filtered
     
     def _is_spam(self, article: Dict) -> bool:
         """Detect spam/low-quality content"""
-        text = article['full_text'].lower()
+        counts = self.spam_matcher.counts(article['full_text'])
         
-        spam_patterns = [
-            'click here', 'buy now', 'limited time', 'act now',
-            'subscribe now', 'sign up today', 'special offer',
-            'free download', 'earn money'
-        ]
+        return any(
+            counts.get(category, 0) >= limit
+            for category, limit in self.spam_limits.items()
+        )
+    
+    def filter_by_keywords(
+        self,
+        articles: List[Dict],
+        keywords: Union[List[str], PatternMatcher]
+    ) -> List[Dict]:
+        """
+        Cheap lexical prefilter: keep articles mentioning any of the keywords
+        (e.g. a tag's name and keywords) as whole words, before embedding
         
-        spam_count = sum(1 for pattern in spam_patterns if pattern in text)
+        Args:
+            articles: List of preprocessed articles
+            keywords: Words or phrases, matched case-insensitively, or a
+                PatternMatcher built from them once (as the pipeline does)
         
-        return spam_count >= 2
+        Returns:
+            Articles whose full_text contains at least one keyword
+        """
+        matcher = keywords
+        if not isinstance(matcher, PatternMatcher):
+            matcher = PatternMatcher({'keyword': keywords}, whole_words=True)
+        kept = [article for article in articles if matcher.matches_any(article['full_text'])]
+        print(f"🔎 {len(kept)} of {len(articles)} articles mention the keywords")
+        return kept
 
 
 def fetch_and_preprocess(
     query: str,
     api_key: str,
     count: int = 100,
-    quality_filter: bool = True
+    quality_filter: bool = True,
+    near_duplicate_threshold: Optional[float] = 0.6,
+    near_duplicate_path: Optional[str] = DEFAULT_NEAR_DUPLICATE_PATH
 ) -> List[Dict]:
     """
     Convenience function to fetch and preprocess articles
@@ -178,7 +384,7 @@ def fetch_and_preprocess(
     Usage:
         articles = fetch_and_preprocess("Artificial Intelligence", NEWS_API_KEY)
     """
-    fetcher = ArticleFetcher(api_key)
+    fetcher = ArticleFetcher(api_key, near_duplicate_threshold, near_duplicate_path)
     
     # Fetch raw articles
     raw_articles = fetcher.fetch_articles(query, count=count)
@@ -192,5 +398,7 @@ def fetch_and_preprocess(
     # Apply quality filter
     if quality_filter:
         processed = fetcher.filter_by_quality(processed)
+    else:
+        processed = fetcher.remember_articles(processed)
     
     return processed
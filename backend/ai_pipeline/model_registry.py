@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, Iterable
+
+SENTENCE_BACKENDS = ('torch', 'onnx', 'int8')
+
+def embedding_name(name: str, backend: str = 'torch', onnx_file: str = None) -> str:
+    """
+    Identifies the vectors a model produces on a backend: 'model' for torch,
+    'model@int8', 'model@onnx' or 'model@onnx:<onnx_file>'. Vectors from
+    different names must not be compared or share a cache entry.
+    """
+    if backend == 'torch':
+        return name
+    if backend == 'onnx' and onnx_file:
+        return f"{name}@onnx:{onnx_file}"
+    return f"{name}@{backend}"
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded ML models
+
+    Each model is loaded at most once, on first use or via warm_up(), and the
+    same instance is shared by every caller (SemanticMatcher, ArticleAnalyzer).
+    Heavy libraries are only imported when a model is actually loaded.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._status = {}  # key -> 'loading' | 'ready' | 'error'
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def sentence_transformer(self, name: str, backend: str = 'torch', onnx_file: str = None):
+        """
+        Shared SentenceTransformer for `name`, run by one of the CPU backends:
+          'torch'  stock PyTorch fp32
+          'onnx'   ONNX Runtime (exported on first load; onnx_file picks a
+                   pre-exported variant such as 'onnx/model_qint8_avx512_vnni.onnx')
+          'int8'   PyTorch with Linear layers dynamically quantized to int8
+        """
+        if backend not in SENTENCE_BACKENDS:
+            raise ValueError(f"Unknown sentence-transformers backend '{backend}' (use one of {SENTENCE_BACKENDS})")
+
+        def load():
+            from sentence_transformers import SentenceTransformer
+            if backend == 'onnx':
+                model_kwargs = {'file_name': onnx_file} if onnx_file else None
+                return SentenceTransformer(name, backend='onnx', model_kwargs=model_kwargs)
+            model = SentenceTransformer(name)
+            if backend == 'int8':
+                import torch
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            return model
+        return self._get(self.sentence_transformer_key(name, backend, onnx_file), load)
+
+    @staticmethod
+    def sentence_transformer_key(name: str, backend: str = 'torch', onnx_file: str = None) -> str:
+        return f"sentence-transformers/{embedding_name(name, backend, onnx_file)}"
+
+    def spacy(self, name: str):
+        """Shared spaCy pipeline for `name`"""
+        def load():
+            import spacy
+            return spacy.load(name)
+        return self._get(f"spacy/{name}", load)
+
+    def warm_up(
+        self,
+        sentence_models: Iterable[str] = (),
+        spacy_models: Iterable[str] = (),
+        sentence_backend: str = 'torch',
+        onnx_file: str = None
+    ):
+        """Load models up front (e.g. from a startup thread) instead of on first request"""
+        for name in sentence_models:
+            self.sentence_transformer(name, sentence_backend, onnx_file)
+        for name in spacy_models:
+            self.spacy(name)
+
+    def is_ready(self, key: str) -> bool:
+        return self._status.get(key) == 'ready'
+
+    def status(self) -> Dict[str, str]:
+        """Load state of every model that has been requested so far"""
+        with self._lock:
+            return dict(self._status)
+
+    def _get(self, key: str, load):
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            model = self._models.get(key)
+            if model is None:
+                print(f"🤖 Loading {key}...")
+                with self._lock:
+                    self._status[key] = 'loading'
+                try:
+                    model = load()
+                except Exception:
+                    with self._lock:
+                        self._status[key] = 'error'
+                    raise
+                self._models[key] = model
+                with self._lock:
+                    self._status[key] = 'ready'
+                print(f"✅ Loaded {key}")
+        return model
+
+
+registry = ModelRegistry()
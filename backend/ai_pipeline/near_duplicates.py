@@ -0,0 +1,208 @@
+import hashlib
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Prime modulus for the MinHash permutations (larger than any 32-bit shingle hash)
+_PRIME = (1 << 61) - 1
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Points per integral when weighing band layouts
+_INTEGRATION_STEPS = 200
+
+def _optimal_bands(
+    threshold: float,
+    num_perm: int,
+    weights: Tuple[float, float] = (0.1, 0.9)
+) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows <= num_perm that minimise the
+    weighted false positive and false negative areas under the LSH S-curve
+    P(s) = 1 - (1 - s ** rows) ** bands, as datasketch does:
+    fp = integral of P over [0, threshold], fn = integral of 1 - P over
+    [threshold, 1]. weights is (false positive, false negative).
+    """
+    def area(start: float, stop: float, curve) -> float:
+        # Midpoint rule
+        width = (stop - start) / _INTEGRATION_STEPS
+        points = start + width * (np.arange(_INTEGRATION_STEPS) + 0.5)
+        return float(curve(points).sum() * width)
+
+    fp_weight, fn_weight = weights
+    best, best_error = None, None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            fp = area(0.0, threshold, lambda s: 1 - (1 - s ** rows) ** bands)
+            fn = area(threshold, 1.0, lambda s: (1 - s ** rows) ** bands)
+            error = fp_weight * fp + fn_weight * fn
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index for near-duplicate article detection.
+
+    Each text becomes a set of character shingles (5-grams of the normalized
+    words, which tolerate small edits in short texts); its MinHash signature estimates
+    Jaccard similarity, and signatures are split into bands so that only
+    articles sharing a band bucket are compared. A candidate counts as a
+    duplicate when its estimated Jaccard similarity is at least `threshold`.
+
+    Bands are chosen to weigh missed duplicates (false negatives) above
+    extra candidates, since every candidate is checked against the
+    threshold anyway: at the default 0.6 an article pair with Jaccard 0.6
+    becomes a candidate about 87% of the time, and at 0.7 about 99%.
+
+    With `path`, signatures are kept in a SQLite file (written by flush())
+    and reloaded on start, so syndicated copies are caught across runs.
+    Stored signatures older than max_age_days are dropped, then the oldest
+    beyond max_entries, so the file does not grow without bound.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        path: Optional[str] = None,
+        seed: int = 1,
+        weights: Tuple[float, float] = (0.1, 0.9),
+        max_age_days: Optional[float] = 30,
+        max_entries: Optional[int] = 100000
+    ):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.bands, self.rows = _optimal_bands(threshold, num_perm, weights)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._pending: List[Tuple[str, np.ndarray]] = []
+        # Signatures are only comparable under the same hash functions
+        self._params = f"minhash:{num_perm}:{shingle_size}:{seed}"
+
+        if path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS minhash_signatures ("
+                    "key TEXT NOT NULL, params TEXT NOT NULL, signature BLOB NOT NULL, "
+                    "created_at REAL, PRIMARY KEY (key, params))"
+                )
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(minhash_signatures)")}
+                if 'created_at' not in columns:
+                    # Files written before pruning existed: start their clock now
+                    conn.execute("ALTER TABLE minhash_signatures ADD COLUMN created_at REAL")
+                    conn.execute("UPDATE minhash_signatures SET created_at = ?", (time.time(),))
+                self._prune(conn)
+                rows = conn.execute(
+                    "SELECT key, signature FROM minhash_signatures WHERE params = ?", (self._params,)
+                ).fetchall()
+            for key, blob in rows:
+                self._insert(key, np.frombuffer(blob, dtype=np.uint32), persist=False)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values) of a text's character shingles"""
+        normalized = " ".join(re.findall(r'\w+', text.lower()))
+        size = self.shingle_size
+        shingles = {normalized[i:i + size] for i in range(max(1, len(normalized) - size + 1))}
+        hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), 'little') for s in shingles],
+            dtype=np.uint64
+        )
+        # (a * x + b) mod p; a, x < 2**32 so the product fits in uint64
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def query(self, text: str, exclude_key: str = None) -> List[Tuple[str, float]]:
+        """Indexed (key, estimated Jaccard) pairs at or above threshold, best first"""
+        return self._query(self.signature(text), exclude_key)
+
+    def add(self, key: str, text: str) -> None:
+        self._insert(key, self.signature(text))
+
+    def check_and_add(self, key: str, text: str) -> Optional[str]:
+        """
+        Key of an indexed near-duplicate of text (other than key itself), or
+        None. Texts without a near-duplicate are added to the index.
+        """
+        signature = self.signature(text)
+        matches = self._query(signature, exclude_key=key)
+        if matches:
+            return matches[0][0]
+        self._insert(key, signature)
+        return None
+
+    def flush(self) -> None:
+        """Write signatures added since the last flush to the SQLite file (if any)"""
+        if not self.path or not self._pending:
+            self._pending = []
+            return
+        with self._connect() as conn:
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO minhash_signatures (key, params, signature, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, self._params, signature.tobytes(), now) for key, signature in self._pending]
+            )
+            self._prune(conn)
+        self._pending = []
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop stored signatures older than max_age_days, then the oldest beyond max_entries"""
+        if self.max_age_days is not None:
+            conn.execute(
+                "DELETE FROM minhash_signatures WHERE created_at < ?",
+                (time.time() - self.max_age_days * 86400,)
+            )
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM minhash_signatures WHERE rowid NOT IN ("
+                "SELECT rowid FROM minhash_signatures ORDER BY created_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def _query(self, signature: np.ndarray, exclude_key: str = None) -> List[Tuple[str, float]]:
+        candidates = set()
+        for band, bucket in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(bucket, ()))
+        candidates.discard(exclude_key)
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def _insert(self, key: str, signature: np.ndarray, persist: bool = True) -> None:
+        if key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for band, bucket in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(bucket, []).append(key)
+        if persist:
+            self._pending.append((key, signature))
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,113 @@
+import json
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+class PatternMatcher:
+    """
+    Aho–Corasick matcher over categorized phrase lists, e.g.
+    {'spam': ['click here', ...], 'blocklist': [...]}.
+
+    The automaton is built once; each scan is a single pass over the
+    (lower-cased, whitespace-collapsed) text, whose cost depends on the text
+    length and number of matches but not on how many patterns there are.
+    With whole_words, a match must not start or end inside a word.
+    """
+
+    def __init__(self, patterns: Dict[str, Iterable[str]], whole_words: bool = False):
+        self.categories = list(patterns)
+        self.whole_words = whole_words
+        self.patterns: List[Tuple[str, int]] = []  # (phrase, category index)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]  # pattern ids ending at each node (incl. via fail links)
+
+        for category_index, category in enumerate(self.categories):
+            phrases = dict.fromkeys(_normalize(phrase) for phrase in patterns[category])
+            for phrase in phrases:
+                if phrase:
+                    self._add(phrase, category_index)
+        self._link()
+
+    @classmethod
+    def from_file(cls, path: str, whole_words: bool = False) -> "PatternMatcher":
+        """Load {category: [phrases]} from a JSON file"""
+        with open(path) as f:
+            return cls(json.load(f), whole_words=whole_words)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> Iterator[Tuple[str, str]]:
+        """Yield (category, phrase) for every match, in text order"""
+        for pattern_id in self._scan(_normalize(text)):
+            phrase, category_index = self.patterns[pattern_id]
+            yield self.categories[category_index], phrase
+
+    def counts(self, text: str, distinct: bool = True) -> Dict[str, int]:
+        """
+        Matches per category (every category present, zeros included).
+        distinct counts each phrase once however often it occurs.
+        """
+        counts = dict.fromkeys(self.categories, 0)
+        seen = set()
+        for pattern_id in self._scan(_normalize(text)):
+            if distinct:
+                if pattern_id in seen:
+                    continue
+                seen.add(pattern_id)
+            counts[self.categories[self.patterns[pattern_id][1]]] += 1
+        return counts
+
+    def matches_any(self, text: str) -> bool:
+        """True as soon as any pattern matches (for cheap prefiltering)"""
+        return next(self._scan(_normalize(text)), None) is not None
+
+    def _scan(self, text: str) -> Iterator[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern_id in out[node]:
+                if self.whole_words and not self._on_word_boundary(text, i, len(self.patterns[pattern_id][0])):
+                    continue
+                yield pattern_id
+
+    @staticmethod
+    def _on_word_boundary(text: str, end: int, length: int) -> bool:
+        start = end - length + 1
+        before_ok = start == 0 or not text[start - 1].isalnum()
+        after_ok = end + 1 == len(text) or not text[end + 1].isalnum()
+        return before_ok and after_ok
+
+    def _add(self, phrase: str, category_index: int) -> None:
+        node = 0
+        for char in phrase:
+            child = self._goto[node].get(char)
+            if child is None:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                child = len(self._goto) - 1
+                self._goto[node][char] = child
+            node = child
+        self._out[node].append(len(self.patterns))
+        self.patterns.append((phrase, category_index))
+
+    def _link(self) -> None:
+        """Breadth-first pass setting failure links and merging their outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
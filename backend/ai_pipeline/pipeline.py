@@ -0,0 +1,306 @@
+import math
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from .content_scraper import DomainRateLimiter, scrape_article_content
+    from .data_fetcher import DEFAULT_NEAR_DUPLICATE_PATH, ArticleFetcher
+    from .pattern_matcher import PatternMatcher
+except ImportError:  # imported as a top-level module by the scripts in this folder
+    from content_scraper import DomainRateLimiter, scrape_article_content
+    from data_fetcher import DEFAULT_NEAR_DUPLICATE_PATH, ArticleFetcher
+    from pattern_matcher import PatternMatcher
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+class Stage:
+    """
+    One step of a StreamingPipeline.
+    fn takes a list of up to batch_size items and returns the items to pass
+    on (it may drop, modify or add items). `workers` threads run fn
+    concurrently, so output order is only preserved with a single worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[List[Dict]], Iterable[Dict]],
+        batch_size: int = 1,
+        workers: int = 1,
+        max_wait_ms: float = 50
+    ):
+        self.name = name
+        self.fn = fn
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_wait = max_wait_ms / 1000  # how long a partial batch waits for more items
+        self.items_in = 0
+        self.items_out = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "stage": self.name,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "batches": self.batches,
+                "busy_seconds": round(self.busy_seconds, 3),
+                # Per worker-second of work, i.e. what this stage could sustain if never starved
+                "items_per_second": round(self.items_in / self.busy_seconds, 1) if self.busy_seconds else None
+            }
+
+class StreamingPipeline:
+    """
+    Runs stages concurrently, connected by bounded queues.
+    A slow stage fills its input queue and blocks the stages before it
+    (backpressure), so at most about queue_size items per stage are in
+    flight and memory does not grow with the size of the source.
+
+        pipeline = StreamingPipeline([Stage('analyze', analyze, batch_size=64), ...])
+        for article in pipeline.run(source):
+            ...
+        pipeline.report()
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 256):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def run(self, source: Iterable[Dict]) -> Iterator[Dict]:
+        """Stream items from source through every stage, yielding the results as they come out"""
+        self._stop.clear()
+        self._error = None
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), name="pipeline-source", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[i], queues[i + 1], remaining),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True
+                ))
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE or item is None:  # None: stopped after an error
+                    break
+                yield item
+        finally:
+            # Also reached when the caller stops iterating early
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            self.wall_seconds = time.monotonic() - start
+        if self._error is not None:
+            raise self._error
+
+    def stats(self) -> List[Dict]:
+        return [stage.stats() for stage in self.stages]
+
+    def report(self) -> None:
+        produced = self.stages[-1].items_out if self.stages else 0
+        print(f"📈 Pipeline finished in {self.wall_seconds:.1f}s ({produced} items out)")
+        for s in self.stats():
+            rate = f"{s['items_per_second']}/s" if s['items_per_second'] is not None else "-"
+            print(f"  {s['stage']:<12} in {s['items_in']:>6}  out {s['items_out']:>6}  "
+                  f"busy {s['busy_seconds']:>7.1f}s  {rate}")
+
+    def _feed(self, source: Iterable[Dict], out: queue.Queue) -> None:
+        try:
+            for item in source:
+                if not self._put(out, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        self._put(out, _DONE)
+
+    def _work(self, stage: Stage, inbox: queue.Queue, out: queue.Queue, remaining: List[int]) -> None:
+        finished = False
+        try:
+            while not finished and not self._stop.is_set():
+                item = self._get(inbox)
+                if item is None:
+                    return  # stopped
+                batch = []
+                deadline = time.monotonic() + stage.max_wait
+                while item is not _DONE:
+                    batch.append(item)
+                    if len(batch) >= stage.batch_size:
+                        break
+                    try:
+                        item = inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if item is _DONE:
+                    self._put(inbox, _DONE)  # let sibling workers see the end too
+                    finished = True
+                if not batch:
+                    continue
+
+                started = time.monotonic()
+                results = list(stage.fn(batch))
+                with stage._lock:
+                    stage.busy_seconds += time.monotonic() - started
+                    stage.items_in += len(batch)
+                    stage.items_out += len(results)
+                    stage.batches += 1
+                for result in results:
+                    if not self._put(out, result):
+                        return
+        except BaseException as e:
+            self._fail(e)
+            return
+
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            self._put(out, _DONE)
+
+    def _get(self, inbox: queue.Queue):
+        """Blocking get that gives up (returns None) once the pipeline is stopped"""
+        while True:
+            try:
+                return inbox.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+
+    def _put(self, out: queue.Queue, item) -> bool:
+        """Blocking put (this is the backpressure) that gives up once the pipeline is stopped"""
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+
+def build_topic_pipeline(
+    fetcher: ArticleFetcher,
+    analyzer,
+    clusterer=None,
+    keywords: Optional[List[str]] = None,
+    scrape: bool = False,
+    scrape_workers: int = 8,
+    per_domain_rate: float = 1.0,
+    batch_size: int = 64,
+    queue_size: int = 256
+) -> StreamingPipeline:
+    """
+    The preprocess -> filter -> (keywords) -> (scrape) -> analyze ->
+    (cluster) stages of fetch_and_preprocess, enrich_with_content,
+    analyze_batch and clustering, as one StreamingPipeline over raw News API
+    articles.
+    
+    With keywords (e.g. a tag's name and keywords), articles that mention
+    none of them as whole words are dropped before they are scraped or
+    embedded; the phrases are compiled into one PatternMatcher up front.
+    Scraping runs scrape_workers downloads at once (rate limited per domain)
+    while earlier batches are embedded and parsed. Clustering needs an
+    IncrementalClusterer, which takes batches as they arrive; each article
+    comes out with a 'cluster_id'.
+    """
+    limiter = DomainRateLimiter(rate=per_domain_rate)
+    # Shared by every preprocess batch (one worker), so duplicates are dropped across the whole stream
+    seen_urls, seen_content_hashes = set(), set()
+
+    def preprocess_batch(batch: List[Dict]) -> List[Dict]:
+        return fetcher.preprocess_articles(batch, seen_urls, seen_content_hashes)
+
+    def scrape_batch(batch: List[Dict]) -> List[Dict]:
+        for article in batch:
+            limiter.acquire(urlparse(article['url']).netloc)
+            scraped = scrape_article_content(article['url'])
+            if scraped and len(scraped) > 200:
+                article['scraped_content'] = scraped
+                article['full_text'] = f"{article['title']} {scraped}"
+        return batch
+
+    def cluster_batch(batch: List[Dict]) -> List[Dict]:
+        clusterer.add_articles(batch)
+        return batch
+
+    stages = [
+        Stage('preprocess', preprocess_batch, batch_size=100),
+        Stage('filter', fetcher.filter_by_quality, batch_size=100),
+    ]
+    if keywords:
+        keyword_matcher = PatternMatcher({'keyword': keywords}, whole_words=True)
+        stages.append(Stage(
+            'keywords',
+            lambda batch: fetcher.filter_by_keywords(batch, keyword_matcher),
+            batch_size=100
+        ))
+    if scrape:
+        stages.append(Stage('scrape', scrape_batch, workers=scrape_workers))
+    stages.append(Stage(
+        'analyze',
+        lambda batch: analyzer.analyze_batch(batch, batch_size=batch_size),
+        batch_size=batch_size
+    ))
+    if clusterer is not None:
+        stages.append(Stage('cluster', cluster_batch, batch_size=batch_size))
+    return StreamingPipeline(stages, queue_size=queue_size)
+
+
+def stream_topic(
+    query: str,
+    api_key: str,
+    analyzer,
+    clusterer=None,
+    count: int = 100,
+    near_duplicate_path: Optional[str] = DEFAULT_NEAR_DUPLICATE_PATH,
+    **pipeline_options
+) -> Iterator[Dict]:
+    """
+    Streaming counterpart of fetch_and_preprocess + enrich_with_content +
+    analyze_batch + clustering: yields analyzed articles as they are ready
+    and prints per-stage throughput at the end.
+    
+    Pass an analyzer with an analysis_cache (the backend's
+    create_article_analyzer() builds one) so articles that come back on a
+    later run skip spaCy. Near-duplicate signatures of the articles kept
+    are saved to near_duplicate_path (the NEAR_DUPLICATE_PATH setting by
+    default; None keeps them in memory), so later runs skip their copies.
+    
+    Usage:
+        analyzer = ArticleAnalyzer(analysis_cache=AnalysisCache())
+        for article in stream_topic("AI", NEWS_API_KEY, analyzer, IncrementalClusterer()):
+            ...
+    """
+    fetcher = ArticleFetcher(api_key, near_duplicate_path=near_duplicate_path)
+    pipeline = build_topic_pipeline(fetcher, analyzer, clusterer, **pipeline_options)
+
+    def source():
+        # Pages flow into the pipeline as they arrive
+        remaining = count
+        for page in fetcher.iter_article_pages(query, pages=math.ceil(count / 100), page_size=min(count, 100)):
+            yield from page[:remaining]
+            remaining -= len(page[:remaining])
+            if remaining <= 0:
+                return
+
+    yield from pipeline.run(source())
+    pipeline.report()
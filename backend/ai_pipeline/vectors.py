@@ -0,0 +1,11 @@
+import numpy as np
+
+def l2_normalize(vectors) -> np.ndarray:
+    """
+    L2-normalize vectors row-wise as contiguous float32.
+    Zero vectors stay zero, so they score 0 against everything.
+    """
+    vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -0,0 +1,77 @@
+# analysis_cache.py
+
+from typing import Dict, List
+from sqlalchemy.exc import IntegrityError
+
+from ai_pipeline.article_analyzer import ArticleAnalyzer
+from config import Config
+from database import SessionLocal
+from db_utils import query_in
+from embedding_cache import content_hash
+from models import ArticleAnalysis
+
+class AnalysisCache:
+    """
+    Persistent store of ArticleAnalyzer results (entities and noun-chunk
+    keywords) backed by the `article_analyses` table.
+    Entries are keyed by a hash of the analyzer version and the exact text
+    that was parsed, so bumping the version re-analyzes everything.
+
+    Pass an instance to ArticleAnalyzer(analysis_cache=...) and analyze_batch
+    only runs spaCy on texts it has not seen before.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def key(self, analyzer_version: str, text: str) -> str:
+        return content_hash(analyzer_version, text)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Look up stored analyses. Returns {key: {'entities', 'keywords'}} for the hits only.
+        """
+        db = self.session_factory()
+        try:
+            rows = query_in(db.query(ArticleAnalysis), ArticleAnalysis.content_hash, keys)
+            return {row.content_hash: {'entities': row.entities, 'keywords': row.keywords} for row in rows}
+        finally:
+            db.close()
+
+    def put_many(self, analyzer_version: str, results: Dict[str, Dict]) -> None:
+        """
+        Store analyses by key. Writes are best-effort: if another run stored
+        the same text concurrently, this batch is simply dropped.
+        """
+        if not results:
+            return
+        existing = self.get_many(list(results))
+        db = self.session_factory()
+        try:
+            for key, result in results.items():
+                if key in existing:
+                    continue
+                db.add(ArticleAnalysis(
+                    content_hash=key,
+                    analyzer_version=analyzer_version,
+                    entities=result['entities'],
+                    keywords=result['keywords']
+                ))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
+
+def create_article_analyzer() -> ArticleAnalyzer:
+    """
+    ArticleAnalyzer configured from Config that keeps its results in the
+    database, so articles seen on an earlier run are not parsed again.
+    It loads the same sentence transformer as create_semantic_matcher().
+    """
+    return ArticleAnalyzer(
+        Config.SEMANTIC_MODEL,
+        embedding_backend=Config.SEMANTIC_BACKEND,
+        onnx_file=Config.SEMANTIC_ONNX_FILE,
+        analysis_cache=AnalysisCache()
+    )
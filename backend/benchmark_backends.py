@@ -0,0 +1,114 @@
+# benchmark_backends.py
+#
+# Compare the CPU inference backends for the semantic model:
+#   python benchmark_backends.py --backends torch onnx int8 --texts 2000
+#
+# For each backend it reports load time and encode throughput, and checks the
+# embeddings against the 'torch' baseline: per-text cosine similarity and how
+# many of each text's top-10 neighbours are unchanged. A backend fails when
+# its minimum cosine drops below --tolerance.
+
+import argparse
+import sys
+import time
+import numpy as np
+from typing import List
+
+from ai_pipeline.model_registry import ModelRegistry, SENTENCE_BACKENDS
+from ai_pipeline.vectors import l2_normalize
+from config import Config
+
+SAMPLE_TEMPLATES = [
+    "{0} shares rise after quarterly earnings beat expectations",
+    "Regulators open an investigation into {0} over data practices",
+    "{0} unveils new chip aimed at AI workloads in data centers",
+    "Analysts question whether {0} can sustain its growth next year",
+    "{0} announces layoffs as demand slows across its core markets",
+]
+SAMPLE_SUBJECTS = ["Apple", "Nvidia", "the central bank", "a Premier League club", "OpenAI", "Tesla", "the EU"]
+
+def load_texts(n: int) -> List[str]:
+    """Article texts from the database when there are enough, synthetic headlines otherwise"""
+    try:
+        from database import SessionLocal
+        from models import Article
+        db = SessionLocal()
+        try:
+            articles = db.query(Article).order_by(Article.id.desc()).limit(n).all()
+            texts = [" ".join(filter(None, [a.title, a.description, (a.content or "")[:500]])) for a in articles]
+        finally:
+            db.close()
+        if len(texts) >= n:
+            return texts
+    except Exception as e:
+        print(f"⚠️  Could not read articles ({e}), using synthetic texts")
+    return [
+        SAMPLE_TEMPLATES[i % len(SAMPLE_TEMPLATES)].format(SAMPLE_SUBJECTS[i % len(SAMPLE_SUBJECTS)]) + f" ({i})"
+        for i in range(n)
+    ]
+
+def top_k_overlap(baseline: np.ndarray, candidate: np.ndarray, k: int = 10) -> float:
+    """Mean fraction of each text's k nearest neighbours shared by both embeddings"""
+    k = min(k, len(baseline) - 1)
+    if k <= 0:
+        return 1.0
+    overlaps = []
+    for start in range(0, len(baseline), 1024):
+        rows = slice(start, start + 1024)
+        base_sim = baseline[rows] @ baseline.T
+        cand_sim = candidate[rows] @ candidate.T
+        for i in range(base_sim.shape[0]):
+            base_sim[i, start + i] = cand_sim[i, start + i] = -np.inf  # exclude self
+        base_top = np.argpartition(-base_sim, k - 1, axis=1)[:, :k]
+        cand_top = np.argpartition(-cand_sim, k - 1, axis=1)[:, :k]
+        overlaps.extend(len(set(b) & set(c)) / k for b, c in zip(base_top, cand_top))
+    return float(np.mean(overlaps))
+
+def benchmark(model_name: str, backends: List[str], texts: List[str], batch_size: int, tolerance: float) -> bool:
+    registry = ModelRegistry()
+    results, baseline, passed = [], None, True
+    for backend in ['torch'] + [b for b in backends if b != 'torch']:
+        start = time.perf_counter()
+        model = registry.sentence_transformer(model_name, backend, Config.SEMANTIC_ONNX_FILE)
+        load_seconds = time.perf_counter() - start
+
+        model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+        start = time.perf_counter()
+        embeddings = l2_normalize(np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32))
+        seconds = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = embeddings
+        cosines = np.sum(baseline * embeddings, axis=1)
+        ok = bool(cosines.min() >= tolerance)
+        passed = passed and ok
+        results.append({
+            "backend": backend,
+            "load_s": load_seconds,
+            "texts_per_s": len(texts) / seconds,
+            "min_cos": float(cosines.min()),
+            "mean_cos": float(cosines.mean()),
+            "top10": top_k_overlap(baseline, embeddings),
+            "ok": ok
+        })
+
+    torch_rate = results[0]["texts_per_s"]
+    print(f"\n📊 {model_name}: {len(texts)} texts, batch size {batch_size}, tolerance {tolerance}")
+    print(f"{'backend':<8} {'load s':>7} {'texts/s':>9} {'speedup':>8} {'min cos':>8} {'mean cos':>9} {'top-10':>7}")
+    for r in results:
+        print(f"{r['backend']:<8} {r['load_s']:>7.1f} {r['texts_per_s']:>9.1f} "
+              f"{r['texts_per_s'] / torch_rate:>7.2f}x {r['min_cos']:>8.4f} {r['mean_cos']:>9.4f} "
+              f"{r['top10']:>7.3f} {'✅' if r['ok'] else '❌'}")
+    return passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentence-transformers CPU backends")
+    parser.add_argument("--model", default=Config.SEMANTIC_MODEL)
+    parser.add_argument("--backends", nargs="+", choices=SENTENCE_BACKENDS, default=list(SENTENCE_BACKENDS))
+    parser.add_argument("--texts", type=int, default=1000, help="Number of texts to encode")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--tolerance", type=float, default=0.98, help="Minimum cosine to the torch embedding")
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    sys.exit(0 if benchmark(args.model, args.backends, texts, args.batch_size, args.tolerance) else 1)
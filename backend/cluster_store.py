@@ -0,0 +1,105 @@
+# cluster_store.py
+
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from database import SessionLocal
+from db_utils import chunked, query_in
+from models import StoryCluster, StoryClusterMember
+
+class ClusterStore:
+    """
+    Persistent storage for ai_pipeline's IncrementalClusterer, backed by the
+    `story_clusters` and `story_cluster_members` tables:
+
+        clusterer = IncrementalClusterer(0.5, 25, store=ClusterStore())
+        clusterer.add_articles(analyzed_articles)
+
+    Only centroids and counts are loaded up front; member embeddings are read
+    when a cluster has to be split.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def load(self) -> Dict[int, Tuple[np.ndarray, int]]:
+        """{cluster_id: (centroid, member_count)} for every stored cluster"""
+        db = self.session_factory()
+        try:
+            rows = db.query(StoryCluster.id, StoryCluster.centroid, StoryCluster.member_count).all()
+            return {
+                cluster_id: (np.frombuffer(centroid, dtype=np.float32), member_count)
+                for cluster_id, centroid, member_count in rows
+            }
+        finally:
+            db.close()
+
+    def existing_members(self, keys: List[str]) -> Dict[str, int]:
+        """{article_url: cluster_id} for the urls that are already clustered"""
+        db = self.session_factory()
+        try:
+            return dict(query_in(
+                db.query(StoryClusterMember.article_url, StoryClusterMember.cluster_id),
+                StoryClusterMember.article_url,
+                keys
+            ))
+        finally:
+            db.close()
+
+    def cluster_members(self, cluster_id: int) -> Tuple[List[str], np.ndarray]:
+        db = self.session_factory()
+        try:
+            rows = db.query(StoryClusterMember.article_url, StoryClusterMember.embedding).filter(
+                StoryClusterMember.cluster_id == cluster_id
+            ).order_by(StoryClusterMember.article_url).all()
+        finally:
+            db.close()
+        if not rows:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return [url for url, _ in rows], np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+
+    def save(
+        self,
+        clusters: Dict[int, Tuple[np.ndarray, int]],
+        members: Dict[str, Tuple[int, np.ndarray]]
+    ) -> None:
+        """
+        Upsert cluster centroids/counts and add members, in one transaction.
+        A member whose vector is None already exists and is moved to its new cluster.
+        """
+        if not clusters and not members:
+            return
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            for cluster_id, (centroid, member_count) in clusters.items():
+                db.merge(StoryCluster(
+                    id=cluster_id,
+                    centroid=np.asarray(centroid, dtype=np.float32).tobytes(),
+                    member_count=member_count,
+                    updated_at=now
+                ))
+            db.flush()
+
+            moves = {}
+            for url, (cluster_id, vector) in members.items():
+                if vector is None:
+                    moves.setdefault(cluster_id, []).append(url)
+                else:
+                    db.add(StoryClusterMember(
+                        article_url=url,
+                        cluster_id=cluster_id,
+                        embedding=np.asarray(vector, dtype=np.float32).tobytes()
+                    ))
+            for cluster_id, urls in moves.items():
+                for chunk in chunked(urls):
+                    db.query(StoryClusterMember).filter(
+                        StoryClusterMember.article_url.in_(chunk)
+                    ).update({StoryClusterMember.cluster_id: cluster_id}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -7,10 +7,46 @@ load_dotenv()
 class Config:
     NEWS_API_KEY = os.getenv('NEWS_API_KEY')
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./cognos.db')
+    DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')  # Optional read replica for read-only endpoints
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))  # Persistent connections per engine (non-SQLite)
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))  # Extra connections allowed under bursts
+    DB_POOL_TIMEOUT_SECONDS = int(os.getenv('DB_POOL_TIMEOUT_SECONDS', 30))  # Wait for a free connection
+    DB_POOL_RECYCLE_SECONDS = int(os.getenv('DB_POOL_RECYCLE_SECONDS', 1800))  # Reconnect before server idle timeouts
+    SQLITE_BUSY_TIMEOUT_SECONDS = float(os.getenv('SQLITE_BUSY_TIMEOUT_SECONDS', 15))  # Wait on a locked database
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # Bytes of the file read via mmap
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))  # Page cache per connection
     NEWS_API_BASE_URL = 'https://newsapi.org/v2'
     MAX_ARTICLES_PER_TAG = 10
     DAYS_BACK = 7
+    REFRESH_CONCURRENCY = int(os.getenv('REFRESH_CONCURRENCY', 8))  # Max NewsAPI requests in flight per refresh
+    
+    # NewsAPI response cache (shared by all endpoints that query NewsAPI)
+    NEWS_CACHE_TTL_SECONDS = int(os.getenv('NEWS_CACHE_TTL_SECONDS', 900))  # 0 disables the cache
+    NEWS_CACHE_MAX_ENTRIES = int(os.getenv('NEWS_CACHE_MAX_ENTRIES', 512))
+    NEWS_CACHE_PATH = os.getenv('NEWS_CACHE_PATH')  # Optional SQLite file so the cache survives restarts
+    NEWS_API_REQUEST_BUDGET = int(os.getenv('NEWS_API_REQUEST_BUDGET', 0))  # Max NewsAPI requests per window (0 = unlimited)
+    NEWS_API_BUDGET_WINDOW_SECONDS = int(os.getenv('NEWS_API_BUDGET_WINDOW_SECONDS', 86400))  # Quota window (daily plan quota)
+    DEEP_FETCH_PAGES = int(os.getenv('DEEP_FETCH_PAGES', 5))  # Pages requested per deep fetch
+    DEEP_FETCH_PAGE_SIZE = 100         # Articles per page in a deep fetch (NewsAPI maximum)
+    NEAR_DUPLICATE_PATH = os.getenv(  # MinHash index kept across ai_pipeline runs ('' keeps it in memory)
+        'NEAR_DUPLICATE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'near_duplicates.db')
+    )
 
     # Semantic matching settings
     SEMANTIC_MODEL = 'all-MiniLM-L6-v2'  # Model name for sentence-transformers
+    SEMANTIC_BACKEND = os.getenv('SEMANTIC_BACKEND', 'torch')  # 'torch', 'onnx' or 'int8' (see benchmark_backends.py)
+    SEMANTIC_ONNX_FILE = os.getenv('SEMANTIC_ONNX_FILE')  # Optional pre-exported ONNX file, e.g. onnx/model_qint8_avx512_vnni.onnx
     SIMILARITY_THRESHOLD = 0.2         # Minimum similarity score to link article to tag
+    EMBEDDING_CACHE_ENABLED = True     # Persist embeddings by content hash to skip re-encoding
+    EMBEDDING_BATCHING = os.getenv('EMBEDDING_BATCHING', 'true').lower() == 'true'  # Coalesce concurrent encodes
+    EMBEDDING_MAX_BATCH_SIZE = int(os.getenv('EMBEDDING_MAX_BATCH_SIZE', 64))
+    EMBEDDING_MAX_WAIT_MS = float(os.getenv('EMBEDDING_MAX_WAIT_MS', 10))
+    BACKFILL_CHUNK_SIZE = 5000         # Stored articles scored per chunk when a new tag is backfilled
+    EMBEDDING_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH', './embedding_store')  # Memory-mapped article vectors ('' disables)
+    EMBEDDING_STORE_DTYPE = os.getenv('EMBEDDING_STORE_DTYPE', 'int8')  # 'int8' or 'float16'
+    WARM_UP_MODELS = os.getenv('WARM_UP_MODELS', 'true').lower() == 'true'  # Load models in the background at startup
+
+    # Background ingestion scheduler
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'false').lower() == 'true'  # Run inside the API process
+    SCHEDULER_INTERVAL_SECONDS = int(os.getenv('SCHEDULER_INTERVAL_SECONDS', 1800))  # Refresh each tag this often
+    SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', 50))  # Max tags refreshed per cycle
@@ -1,15 +1,69 @@
 # database.py
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
 from models import Base
+from migrations import upgrade_schema
 from config import Config
 
-engine = create_engine(Config.DATABASE_URL, connect_args={"check_same_thread": False})
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def _create_engine(database_url: str, read_only: bool = False) -> Engine:
+    """
+    Engine tuned for the backend behind database_url.
+    SQLite runs in WAL mode, so readers and the (single) writer no longer
+    block each other; other databases get a sized, pre-pinged connection pool.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(
+            url,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=Config.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True  # drop connections the server closed while idle
+        )
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": Config.SQLITE_BUSY_TIMEOUT_SECONDS}
+    )
+    wal = _is_sqlite_file(url)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")  # fsync at checkpoints only; safe with WAL
+        cursor.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")  # negative: size in KiB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return engine
+
+engine = _create_engine(Config.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Reads go to DATABASE_READ_URL (e.g. a replica) when set. On a SQLite file
+# they get their own query-only pool, so feed reads never queue behind
+# ingestion writes for a connection.
+if Config.DATABASE_READ_URL or _is_sqlite_file(make_url(Config.DATABASE_URL)):
+    read_engine = _create_engine(Config.DATABASE_READ_URL or Config.DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 def init_db():
     """Initialize database - create all tables"""
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)  # create_all never alters tables that already exist
     print("✅ Cognos database initialized!")
 
 def get_db():
@@ -19,3 +73,26 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Dependency for a read-only DB session (served by the read engine)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _pool_stats(pool) -> Dict:
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        stats[name] = method() if callable(method) else None
+    stats["type"] = type(pool).__name__
+    return stats
+
+def pool_stats() -> Dict:
+    """Connection pool usage of the write and read engines"""
+    return {
+        "write": _pool_stats(engine.pool),
+        "read": _pool_stats(read_engine.pool) if read_engine is not engine else "shared"
+    }
@@ -0,0 +1,22 @@
+# db_utils.py
+
+from typing import Iterator, List, Sequence
+
+# Values per IN (...) clause, well under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+def chunked(values: Sequence, size: int = LOOKUP_CHUNK_SIZE) -> Iterator[List]:
+    """Consecutive slices of values, each small enough for one IN (...) clause"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def query_in(query, column, values: Sequence) -> List:
+    """
+    query.filter(column.in_(values)).all(), run one chunk of values at a
+    time (duplicates dropped), so any number of values can be looked up.
+    """
+    rows = []
+    for chunk in chunked(dict.fromkeys(values)):
+        rows.extend(query.filter(column.in_(chunk)).all())
+    return rows
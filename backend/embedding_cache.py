@@ -0,0 +1,71 @@
+# embedding_cache.py
+
+import hashlib
+import numpy as np
+from typing import Dict, List
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from db_utils import query_in
+from models import EmbeddingCache as EmbeddingCacheRow
+
+def content_hash(model_name: str, text: str) -> str:
+    """
+    Hash identifying an embedding: the model name plus the exact embedded text.
+    """
+    payload = f"{model_name}\x00{text}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache backed by the `embedding_cache` table.
+    Entries are keyed by a hash of the model name and the exact text that was
+    embedded, so changing either one produces a fresh entry.
+    """
+
+    def __init__(self, model_name: str, session_factory=SessionLocal):
+        self.model_name = model_name
+        self.session_factory = session_factory
+
+    def key(self, text: str) -> str:
+        """
+        Content hash for a text under this cache's model.
+        """
+        return content_hash(self.model_name, text)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings. Returns {key: vector} for the hits only.
+        """
+        db = self.session_factory()
+        try:
+            rows = query_in(db.query(EmbeddingCacheRow), EmbeddingCacheRow.content_hash, keys)
+            return {row.content_hash: np.frombuffer(row.vector, dtype=np.float32) for row in rows}
+        finally:
+            db.close()
+
+    def put_many(self, embeddings: Dict[str, np.ndarray]) -> None:
+        """
+        Store embeddings by key. Writes are best-effort: if another request
+        cached the same text concurrently, this batch is simply dropped.
+        """
+        if not embeddings:
+            return
+        existing = self.get_many(list(embeddings))
+        db = self.session_factory()
+        try:
+            for key, vector in embeddings.items():
+                if key in existing:
+                    continue
+                vector = np.asarray(vector, dtype=np.float32)
+                db.add(EmbeddingCacheRow(
+                    content_hash=key,
+                    model_name=self.model_name,
+                    dimension=vector.shape[0],
+                    vector=vector.tobytes()
+                ))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        finally:
+            db.close()
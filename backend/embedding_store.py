@@ -0,0 +1,232 @@
+# embedding_store.py
+
+import json
+import os
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ai_pipeline.vectors import l2_normalize
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, so run a single writer process
+    fcntl = None
+
+# Rows dequantized per chunk when scanning the whole store
+SCAN_CHUNK_SIZE = 65536
+# Quantized candidates rescored at float32 per requested result
+RESCORE_FACTOR = 4
+
+class MemmapEmbeddingStore:
+    """
+    Append-only on-disk article embedding matrix, opened with np.memmap so
+    any number of processes can read it zero-copy.
+
+    Vectors are L2-normalized and stored quantized, either as float16 or as
+    int8 with one float32 scale per row (1M x 384 int8 is about 390 MB).
+
+    search() ranks candidates on the quantized rows, then rescores the best
+    k * rescore_factor against float32 copies kept in a sidecar file. The
+    sidecar is memory-mapped as well, so it costs disk (1.5 GB at 1M x 384)
+    but only the rescored rows are ever read. With keep_float32=False there
+    is no sidecar and the quantized scores are final; an existing store
+    keeps the layout it was created with.
+
+    Files in `path`: meta.json, ids.i64, vectors.<dtype>, scales.f32 (int8
+    only), full.f32 (keep_float32 only) and append.lock. The ids file is
+    written last on append, so a reader never sees a row whose data is
+    incomplete. Appends hold an exclusive flock on append.lock, so several
+    processes (e.g. uvicorn workers and the scheduler) can share one store;
+    without fcntl only a single writer process is supported. Readers pick
+    up appends via refresh().
+    """
+
+    def __init__(self, path: str, dtype: str = 'int8', keep_float32: bool = True):
+        if dtype not in ('int8', 'float16'):
+            raise ValueError(f"Unsupported store dtype '{dtype}' (use 'int8' or 'float16')")
+        self.path = path
+        self.dtype = dtype
+        self.keep_float32 = keep_float32
+        self.dim: Optional[int] = None
+        self._lock = threading.RLock()
+        self._count = 0
+        self._ids = self._vectors = self._scales = self._full = None
+        self._id_to_row: Dict[int, int] = {}
+
+        os.makedirs(path, exist_ok=True)
+        self._load_meta()
+        self.refresh()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._count
+
+    def __contains__(self, item_id: int) -> bool:
+        self.refresh()
+        return item_id in self._id_to_row
+
+    def missing(self, ids: List[int]) -> List[int]:
+        """The ids that are not stored (yet), in input order"""
+        self.refresh()
+        return [item_id for item_id in ids if item_id not in self._id_to_row]
+
+    def refresh(self) -> None:
+        """Re-map the files if rows were appended (by this or another process)"""
+        with self._lock:
+            ids_path = self._file('ids.i64')
+            count = os.path.getsize(ids_path) // 8 if os.path.exists(ids_path) else 0
+            if count == self._count and self._ids is not None:
+                return
+            if self.dim is None:
+                self._load_meta()  # first rows were written by another process
+            self._count = count
+            if count == 0:
+                self._ids = np.zeros(0, dtype=np.int64)
+                return
+            self._ids = np.memmap(ids_path, dtype=np.int64, mode='r', shape=(count,))
+            self._vectors = np.memmap(
+                self._file(f'vectors.{self.dtype}'), dtype=self.dtype, mode='r', shape=(count, self.dim)
+            )
+            if self.dtype == 'int8':
+                self._scales = np.memmap(self._file('scales.f32'), dtype=np.float32, mode='r', shape=(count,))
+            if self.keep_float32:
+                self._full = np.memmap(self._file('full.f32'), dtype=np.float32, mode='r', shape=(count, self.dim))
+            for row in range(len(self._id_to_row), count):
+                self._id_to_row[int(self._ids[row])] = row
+
+    def append(self, ids: List[int], vectors: np.ndarray) -> int:
+        """Append rows for ids not stored yet. Returns how many were written."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        with self._lock, self._exclusive():
+            self.refresh()  # under the file lock, so rows other writers added are seen
+            keep, seen = [], set()
+            for i, item_id in enumerate(ids):
+                if item_id not in self._id_to_row and item_id not in seen:
+                    seen.add(item_id)
+                    keep.append(i)
+            if not keep:
+                return 0
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self._file('meta.json'), 'w') as f:
+                    json.dump({'dim': self.dim, 'dtype': self.dtype, 'float32': self.keep_float32}, f)
+
+            rows = l2_normalize(vectors[keep])
+            quantized, scales = self._quantize(rows)
+            self._truncate_partial_rows()
+            with open(self._file(f'vectors.{self.dtype}'), 'ab') as f:
+                f.write(quantized.tobytes())
+            if scales is not None:
+                with open(self._file('scales.f32'), 'ab') as f:
+                    f.write(scales.tobytes())
+            if self.keep_float32:
+                with open(self._file('full.f32'), 'ab') as f:
+                    f.write(rows.tobytes())
+            with open(self._file('ids.i64'), 'ab') as f:
+                f.write(np.asarray([ids[i] for i in keep], dtype=np.int64).tobytes())
+            self.refresh()
+            return len(keep)
+
+    def get(self, ids: List[int]) -> np.ndarray:
+        """Normalized (dequantized) float32 vectors for ids"""
+        self.refresh()
+        rows = np.asarray([self._id_to_row[item_id] for item_id in ids], dtype=np.int64)
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == 'int8':
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def search(
+        self,
+        query: np.ndarray,
+        ids: List[int],
+        k: int = 10,
+        rescore_factor: int = RESCORE_FACTOR
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (id, cosine similarity) pairs among the stored ids, best first.
+        The ids are scored on their quantized rows and the best
+        k * rescore_factor are rescored against float32 (if kept).
+        """
+        self.refresh()
+        ids = [item_id for item_id in ids if item_id in self._id_to_row]
+        if not ids or k <= 0:
+            return []
+        query = l2_normalize(query)[0]
+        scores = self.get(ids) @ query
+
+        n_rescore = min(len(ids), k * max(1, rescore_factor))
+        top = np.argpartition(-scores, n_rescore - 1)[:n_rescore]
+        top_ids = [ids[i] for i in top]
+        if self._full is not None:
+            rows = np.asarray([self._id_to_row[item_id] for item_id in top_ids], dtype=np.int64)
+            scores = np.asarray(self._full[rows]) @ query
+        else:
+            scores = scores[top]
+
+        k = min(k, len(top_ids))
+        best = np.argsort(-scores)[:k]
+        return [(int(top_ids[i]), float(scores[i])) for i in best]
+
+    def iter_chunks(self, chunk_size: int = SCAN_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (ids, dequantized float32 vectors) over the whole store in row order"""
+        self.refresh()
+        for start in range(0, self._count, chunk_size):
+            stop = min(start + chunk_size, self._count)
+            yield np.array(self._ids[start:stop]), self._dequantize(start, stop)
+
+    def _truncate_partial_rows(self) -> None:
+        """Drop data a crashed append wrote past the last committed id, so new rows stay aligned"""
+        sizes = {f'vectors.{self.dtype}': self._count * self.dim * np.dtype(self.dtype).itemsize}
+        if self.dtype == 'int8':
+            sizes['scales.f32'] = self._count * 4
+        if self.keep_float32:
+            sizes['full.f32'] = self._count * self.dim * 4
+        for name, size in sizes.items():
+            file_path = self._file(name)
+            if os.path.exists(file_path) and os.path.getsize(file_path) > size:
+                os.truncate(file_path, size)
+
+    def _dequantize(self, start: int, stop: int) -> np.ndarray:
+        vectors = np.asarray(self._vectors[start:stop], dtype=np.float32)
+        if self.dtype == 'int8':
+            vectors *= self._scales[start:stop][:, None]
+        return vectors
+
+    def _quantize(self, rows: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dtype == 'float16':
+            return rows.astype(np.float16), None
+        # Symmetric per-row int8: row ~= q * scale
+        scales = np.abs(rows).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.round(rows / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _load_meta(self) -> None:
+        meta_path = self._file('meta.json')
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta['dtype'] != self.dtype:
+            raise ValueError(f"Store at {self.path} holds {meta['dtype']} vectors, not {self.dtype}")
+        self.dim = meta['dim']
+        self.keep_float32 = meta.get('float32', False)  # the sidecar exists only if it was kept from the start
+
+    @contextmanager
+    def _exclusive(self):
+        """Cross-process append lock (a no-op without fcntl)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._file('append.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
@@ -0,0 +1,93 @@
+# embedding_worker.py
+
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching for model.encode.
+    Requests from many threads are queued and a single worker thread
+    coalesces them into one encode call, flushing a batch as soon as it
+    holds max_batch_size texts or the oldest text has waited max_wait_ms.
+    Callers get a Future per text.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10
+    ):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.dimension = None  # learned from the first encoded batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the Future resolves to its embedding"""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def submit_many(self, texts: List[str]) -> List[Future]:
+        return [self.submit(text) for text in texts]
+
+    def encode_many(self, texts: List[str]) -> np.ndarray:
+        """Blocking helper: submit texts and wait for all their embeddings"""
+        if not texts:
+            if self.dimension is None:
+                self.submit("").result()  # one throwaway encode to learn the dimension
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.vstack([future.result() for future in self.submit_many(texts)])
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "texts": self._texts,
+                "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000
+            }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.dimension = len(embeddings[0])
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+            with self._stats_lock:
+                self._batches += 1
+                self._texts += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
@@ -0,0 +1,225 @@
+# ingestion.py
+
+import numpy as np
+from typing import Dict, List, Tuple
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from ai_pipeline.vectors import l2_normalize
+from db_utils import query_in
+from models import Article, ArticleTag
+
+@event.listens_for(Session, 'after_commit')
+def _index_after_commit(session):
+    """Add freshly ingested articles to the matcher's index once their ids are durable"""
+    for matcher, article_ids, embeddings in session.info.pop('pending_index', []):
+        matcher.index_articles(article_ids, embeddings)
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_pending_index(session):
+    session.info.pop('pending_index', None)
+
+def _conflict_insert(db: Session):
+    """The dialect's insert() with on_conflict_do_nothing (SQLite, PostgreSQL), or None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+def upsert_articles(db: Session, article_dicts: List[Dict]) -> Tuple[List[Article], int]:
+    """
+    Resolve fetched articles against the articles table in bulk.
+    New URLs are inserted with INSERT ... ON CONFLICT (url) DO NOTHING, so a
+    concurrent ingestion of the same URL is skipped rather than failing on
+    the unique constraint; every row is then loaded with one IN query per
+    chunk. Other databases look up existing URLs first. Nothing is
+    committed, so the caller can keep the whole ingestion in one transaction.
+
+    Returns (articles, new_count), with one Article per unique URL in input order.
+    """
+    by_url = {}
+    for article_data in article_dicts:
+        by_url.setdefault(article_data['url'], article_data)
+    urls = list(by_url)
+    if not urls:
+        return [], 0
+
+    insert_stmt = _conflict_insert(db)
+    if insert_stmt is None:
+        stored = {article.url for article in query_in(db.query(Article.url), Article.url, urls)}
+        new_rows = [by_url[url] for url in urls if url not in stored]
+        for rows in _group_by_columns(new_rows):
+            db.execute(insert(Article), rows)
+        new_count = len(new_rows)
+    else:
+        new_count = 0
+        for rows in _group_by_columns(list(by_url.values())):
+            stmt = insert_stmt(Article).on_conflict_do_nothing(index_elements=['url']).returning(Article.id)
+            new_count += len(db.execute(stmt, rows).all())
+
+    loaded = {article.url: article for article in query_in(db.query(Article), Article.url, urls)}
+    return [loaded[url] for url in urls], new_count
+
+def _group_by_columns(rows: List[Dict]) -> List[List[Dict]]:
+    """Split rows into batches sharing one set of keys, as a multi-row INSERT needs"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+def link_articles(db: Session, links: List[Dict]) -> int:
+    """
+    Insert ArticleTag rows, skipping (article_id, tag_id) pairs that already exist.
+    Uses INSERT ... ON CONFLICT DO NOTHING against the unique constraint on
+    SQLite and PostgreSQL, and looks up existing pairs first on other
+    databases, in the caller's transaction. Returns the number of links
+    actually created.
+    """
+    if not links:
+        return 0
+
+    # Collapse duplicate pairs within the batch, keeping the best score
+    unique = {}
+    for link in links:
+        key = (link['article_id'], link['tag_id'])
+        if key not in unique or link['relevance_score'] > unique[key]['relevance_score']:
+            unique[key] = link
+
+    insert_stmt = _conflict_insert(db)
+    if insert_stmt is None:
+        return _insert_missing_links(db, unique)
+
+    stmt = insert_stmt(ArticleTag).on_conflict_do_nothing(
+        index_elements=['article_id', 'tag_id']
+    ).returning(ArticleTag.id)
+    result = db.execute(stmt, list(unique.values()))
+    return len(result.all())
+
+def _insert_missing_links(db: Session, unique: Dict[Tuple[int, int], Dict]) -> int:
+    """Query-then-insert fallback of link_articles for databases without ON CONFLICT support here"""
+    article_ids = sorted({article_id for article_id, _ in unique})
+    tag_ids = sorted({tag_id for _, tag_id in unique})
+    existing = set(query_in(
+        db.query(ArticleTag.article_id, ArticleTag.tag_id).filter(ArticleTag.tag_id.in_(tag_ids)),
+        ArticleTag.article_id,
+        article_ids
+    ))
+
+    new_links = [link for key, link in unique.items() if key not in existing]
+    if new_links:
+        db.execute(insert(ArticleTag), new_links)
+    return len(new_links)
+
+def ingest_and_match(
+    db: Session,
+    matcher,
+    article_dicts: List[Dict],
+    tag_ids: List[int],
+    tag_matrix: np.ndarray,
+    threshold: float
+) -> Tuple[int, int]:
+    """
+    Store fetched articles (with their embeddings, also added to the
+    matcher's ANN index) and link them to every tag they match.
+    All articles are embedded in one batch (before any write, so the
+    embedding cache never waits on this transaction) and scored against the
+    normalized tag_matrix, whose rows correspond to tag_ids, in one product.
+    The caller commits.
+
+    Returns (new_articles, matched_links).
+    """
+    if not article_dicts:
+        return 0, 0
+
+    article_texts = [
+        matcher.create_article_text(
+            article_data['title'],
+            article_data.get('description') or "",
+            article_data.get('content') or ""
+        )
+        for article_data in article_dicts
+    ]
+    embeddings_by_url = {}
+    for article_data, embedding in zip(article_dicts, matcher.get_embeddings_batch(article_texts)):
+        embeddings_by_url.setdefault(article_data['url'], embedding)
+
+    # New rows are inserted with their embedding; older rows get one backfilled
+    stored_articles, new_count = upsert_articles(db, [
+        dict(article_data, embedding=np.asarray(embeddings_by_url[article_data['url']], dtype=np.float32).tobytes())
+        for article_data in article_dicts
+    ])
+    for article in stored_articles:
+        if article.embedding is None:
+            article.embedding = np.asarray(embeddings_by_url[article.url], dtype=np.float32).tobytes()
+    db.flush()
+    # Indexed only once the transaction commits (see _index_after_commit)
+    db.info.setdefault('pending_index', []).append((
+        matcher,
+        [article.id for article in stored_articles],
+        np.vstack([embeddings_by_url[article.url] for article in stored_articles])
+    ))
+    if not tag_ids:
+        return new_count, 0
+
+    scores = l2_normalize(
+        np.vstack([embeddings_by_url[article.url] for article in stored_articles])
+    ) @ tag_matrix.T
+    for article, best in zip(stored_articles, scores.max(axis=1)):
+        print(f"Article: {article.title[:60]}... | Similarity: {best:.3f}")
+
+    article_idx, tag_idx = np.nonzero(scores >= threshold)
+    links = [
+        {
+            'article_id': stored_articles[a].id,
+            'tag_id': tag_ids[t],
+            'relevance_score': float(scores[a, t])
+        }
+        for a, t in zip(article_idx, tag_idx)
+    ]
+    return new_count, link_articles(db, links)
+
+def backfill_tag_matches(
+    db: Session,
+    matcher,
+    tag_id: int,
+    tag_embedding: np.ndarray,
+    threshold: float,
+    chunk_size: int = 5000
+) -> int:
+    """
+    Link a (new) tag to every already-stored article above threshold.
+    Article embeddings are read in id-ordered chunks of chunk_size, so memory
+    stays bounded however large the corpus is; each chunk is scored with one
+    matrix-vector product and its matches bulk-inserted. When the matcher has
+    a memory-mapped article store, that is scanned instead of the blobs, and
+    only articles missing from it are read from the database.
+    The caller commits.
+
+    Returns the number of links created.
+    """
+    tag_vector = l2_normalize(tag_embedding)[0]
+    created = 0
+
+    scanned_store = matcher.article_store is not None and matcher.index_loaded
+    if scanned_store:
+        # Score the memory-mapped store first; only articles missing from it are read from the DB
+        for ids, vectors in matcher.article_store.iter_chunks(chunk_size):
+            scores = vectors @ tag_vector
+            matched = np.nonzero(scores >= threshold)[0]
+            created += link_articles(db, [
+                {'article_id': int(ids[i]), 'tag_id': tag_id, 'relevance_score': float(scores[i])}
+                for i in matched
+            ])
+
+    for article_ids, embeddings in matcher.iter_db_embeddings(db, chunk_size, skip_stored=scanned_store):
+        scores = l2_normalize(embeddings) @ tag_vector
+        matched = np.nonzero(scores >= threshold)[0]
+        created += link_articles(db, [
+            {'article_id': article_ids[i], 'tag_id': tag_id, 'relevance_score': float(scores[i])}
+            for i in matched
+        ])
+    return created
@@ -1,19 +1,29 @@
 # main.py
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware  # ADD THIS
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import or_, and_
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import base64
+import threading
 
-from database import get_db, init_db
+from database import get_db, get_read_db, init_db, pool_stats, SessionLocal
 from models import User, Tag, Article, ArticleTag
-from news_fetcher import NewsFetcher
+from news_fetcher import NewsFetcher, get_request_budget
 from fastapi.responses import HTMLResponse
-from semantic_matcher import SemanticMatcher
+from semantic_matcher import create_semantic_matcher
+from ai_pipeline.model_registry import registry
+from ai_pipeline.vectors import l2_normalize
+from tag_embeddings import TagEmbeddingStore
+from ingestion import ingest_and_match, backfill_tag_matches
+from scheduler import IngestionScheduler
 from config import Config
 
-semantic_matcher = SemanticMatcher()
+semantic_matcher = create_semantic_matcher()
+tag_store = TagEmbeddingStore(semantic_matcher)
+scheduler = IngestionScheduler(semantic_matcher, tag_store)
 
 app = FastAPI(title="Cognos", description="Intelligent conversation context platform")
 
@@ -39,15 +49,53 @@ class TagResponse(BaseModel):
     class Config:
         from_attributes = True
 
+def load_article_index():
+    db = SessionLocal()
+    try:
+        semantic_matcher.load_article_index(db)
+    finally:
+        db.close()
+
 @app.on_event("startup")
 def startup_event():
     init_db()
+    if Config.WARM_UP_MODELS:
+        # Load models off the startup path; non-ML endpoints are usable immediately
+        threading.Thread(
+            target=registry.warm_up,
+            kwargs={
+                "sentence_models": [Config.SEMANTIC_MODEL],
+                "sentence_backend": Config.SEMANTIC_BACKEND,
+                "onnx_file": Config.SEMANTIC_ONNX_FILE
+            },
+            name="model-warm-up",
+            daemon=True
+        ).start()
+    threading.Thread(target=load_article_index, name="article-index-load", daemon=True).start()
+    if Config.SCHEDULER_ENABLED:
+        scheduler.start()
     print("🚀 Cognos API started!")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    scheduler.stop()
+
 @app.get("/")
 def read_root():
     return {"app": "Cognos", "status": "running", "version": "0.1.0"}
 
+@app.get("/health")
+def health():
+    """Liveness plus model readiness, without triggering a model load"""
+    return {
+        "status": "ok",
+        "models_ready": semantic_matcher.is_ready,
+        "models": registry.status(),
+        "embedding_worker": semantic_matcher.batcher.stats() if semantic_matcher.batcher else None,
+        "newsapi_budget_remaining": get_request_budget().remaining(),
+        "database_pools": pool_stats()
+    }
+
 @app.get("/test/newsapi")
 def test_newsapi():
     fetcher = NewsFetcher()
@@ -66,14 +114,14 @@ def create_user(email: str, name: str, db: Session = Depends(get_db)):
 
 # ADD THIS NEW ENDPOINT
 @app.get("/users")
-def get_users(db: Session = Depends(get_db)):
+def get_users(db: Session = Depends(get_read_db)):
     """Get all users"""
     users = db.query(User).all()
     return [{"id": user.id, "email": user.email, "name": user.name} for user in users]
 
 # ADD THIS NEW ENDPOINT
 @app.get("/tags")
-def get_all_tags(db: Session = Depends(get_db)):
+def get_all_tags(db: Session = Depends(get_read_db)):
     """Get all tags (for frontend)"""
     tags = db.query(Tag).all()
     return [
@@ -100,84 +148,124 @@ def create_tag(user_id: int, tag_data: TagCreate, db: Session = Depends(get_db))
         category=None,  # Set to None for now, AI will fill later
         keywords=tag_data.keywords
     )
+    # Embed the tag once up front; matching reuses the stored vector
+    tag_store.embed_tags([tag])
     db.add(tag)
     db.commit()
     db.refresh(tag)
+    
+    # Match the new tag against articles already in the database, no NewsAPI call needed
+    matched_count = backfill_tag_matches(
+        db, semantic_matcher, tag.id, tag_store.tag_vector(tag),
+        Config.SIMILARITY_THRESHOLD, Config.BACKFILL_CHUNK_SIZE
+    )
+    db.commit()
+    db.refresh(tag)
+    print(f"✅ Backfilled {matched_count} existing articles for tag '{tag.tag_name}'")
     return tag
 
 
 @app.get("/users/{user_id}/tags", response_model=List[TagResponse])
-def get_user_tags(user_id: int, db: Session = Depends(get_db)):
+def get_user_tags(user_id: int, db: Session = Depends(get_read_db)):
     tags = db.query(Tag).filter(Tag.user_id == user_id).all()
     return tags
 
 @app.get("/tags/{tag_id}/fetch-news")
-def fetch_news_for_tag(tag_id: int, db: Session = Depends(get_db)):
+def fetch_news_for_tag(
+    tag_id: int,
+    deep: bool = False,
+    pages: int = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Fetch and match news for a tag. With deep=true, up to `pages` pages
+    (default DEEP_FETCH_PAGES) are fetched concurrently within the NewsAPI
+    request budget, and each page is ingested as soon as it arrives.
+    """
     tag = db.query(Tag).filter(Tag.id == tag_id).first()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     
     fetcher = NewsFetcher()
-    articles = fetcher.fetch_by_keyword(tag.tag_name)
-    
-    # Prepare tag text for embedding
-    tag_text = semantic_matcher.create_tag_text(
-        tag.tag_name, 
-        tag.keywords or [], 
-        tag.category or ""
-    )
-    tag_embedding = semantic_matcher.get_embedding(tag_text)
+    tag_matrix = l2_normalize(tag_store.tag_vector(tag))
     
-    saved_count = 0
-    matched_count = 0
+    if deep:
+        page_batches = fetcher.iter_pages(tag.tag_name, pages=pages)
+    else:
+        page_batches = [fetcher.fetch_by_keyword(tag.tag_name)]
     
-    for article_data in articles:
-        # Check if article already exists
-        existing = db.query(Article).filter(Article.url == article_data['url']).first()
-        if existing:
-            article = existing
-        else:
-            article = Article(**article_data)
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-            saved_count += 1
-        
-        # Prepare article text for embedding
-        article_text = semantic_matcher.create_article_text(
-            article.title,
-            article.description or "",
-            article.content or ""
+    fetched = saved_count = matched_count = page_count = 0
+    for articles in page_batches:
+        # Resolve/insert the page's articles and write links in a single transaction
+        saved, matched = ingest_and_match(
+            db, semantic_matcher, articles, [tag.id], tag_matrix, Config.SIMILARITY_THRESHOLD
         )
-        article_embedding = semantic_matcher.get_embedding(article_text)
-        similarity = semantic_matcher.calculate_similarity(article_embedding, tag_embedding)
-        print(f"Article: {article.title[:60]}... | Similarity: {similarity:.3f}")
+        db.commit()
+        fetched += len(articles)
+        saved_count += saved
+        matched_count += matched
+        page_count += 1
+    return {
+        "tag": tag.tag_name,
+        "pages": page_count,
+        "fetched": fetched,
+        "new_articles": saved_count,
+        "matched_articles": matched_count,
+        "threshold": Config.SIMILARITY_THRESHOLD
+    }
 
-        # Only link if similarity is above threshold
-        if similarity >= Config.SIMILARITY_THRESHOLD:
-            # Check if link already exists
-            existing_link = db.query(ArticleTag).filter(
-                ArticleTag.article_id == article.id,
-                ArticleTag.tag_id == tag.id
-            ).first()
-            if not existing_link:
-                article_tag = ArticleTag(
-                    article_id=article.id,
-                    tag_id=tag.id,
-                    relevance_score=similarity
-                )
-                db.add(article_tag)
-                matched_count += 1
+@app.post("/users/{user_id}/refresh")
+def refresh_user_tags(user_id: int, db: Session = Depends(get_db)):
+    """
+    Refresh all of a user's tags at once.
+    Tag queries are fetched concurrently, then every fetched article is
+    embedded and matched against all of the user's tags in one pass.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    tag_ids, tag_matrix = tag_store.user_matrix(db, user_id)
+    if not tag_ids:
+        return {"user_id": user_id, "tags": 0, "fetched": 0, "new_articles": 0,
+                "matched_articles": 0, "threshold": Config.SIMILARITY_THRESHOLD}
     
+    tag_names = [tag.tag_name for tag in user.tags]
+    fetcher = NewsFetcher()
+    results = fetcher.fetch_many(tag_names)
+    articles = [article for batch in results.values() for article in batch]
+    
+    saved_count, matched_count = ingest_and_match(
+        db, semantic_matcher, articles, tag_ids, tag_matrix, Config.SIMILARITY_THRESHOLD
+    )
     db.commit()
     return {
-        "tag": tag.tag_name,
+        "user_id": user_id,
+        "tags": len(tag_ids),
         "fetched": len(articles),
         "new_articles": saved_count,
         "matched_articles": matched_count,
         "threshold": Config.SIMILARITY_THRESHOLD
     }
 
+@app.get("/tags/{tag_id}/refresh-state")
+def get_tag_refresh_state(tag_id: int, db: Session = Depends(get_read_db)):
+    """When the background scheduler last refreshed this tag, and how it went"""
+    tag = db.query(Tag).filter(Tag.id == tag_id).first()
+    if not tag:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    state = tag.refresh_state
+    if not state:
+        return {"tag_id": tag_id, "last_refreshed_at": None, "last_status": None,
+                "last_error": None, "articles_fetched": 0}
+    return {
+        "tag_id": tag_id,
+        "last_refreshed_at": state.last_refreshed_at,
+        "last_status": state.last_status,
+        "last_error": state.last_error,
+        "articles_fetched": state.articles_fetched
+    }
+
 @app.get("/news/search")
 def search_news_by_keyword(keyword: str, page_size: int = 10):
     """
@@ -204,29 +292,94 @@ def search_news_by_keyword(keyword: str, page_size: int = 10):
         "articles": results
     }
 
+def _encode_cursor(relevance_score: float, link_id: int) -> str:
+    raw = f"{relevance_score!r}:{link_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        score, link_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(score), int(link_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/tags/{tag_id}/articles")
-def get_tag_articles(tag_id: int, min_score: float = 0.0, db: Session = Depends(get_db)):
+def get_tag_articles(
+    tag_id: int,
+    min_score: float = 0.0,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Articles matched to a tag, best first, one page at a time.
+    Pass the returned next_cursor back as `cursor` to get the following page.
+    """
     tag = db.query(Tag).filter(Tag.id == tag_id).first()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
-    links = db.query(ArticleTag).filter(
+    
+    query = db.query(ArticleTag.id, ArticleTag.relevance_score, Article).join(
+        Article, Article.id == ArticleTag.article_id
+    ).filter(
         ArticleTag.tag_id == tag_id,
         ArticleTag.relevance_score >= min_score
-    ).order_by(ArticleTag.relevance_score.desc()).all()
+    )
+    if cursor:
+        # Keyset pagination: continue strictly after the last (score, id) seen
+        last_score, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            ArticleTag.relevance_score < last_score,
+            and_(ArticleTag.relevance_score == last_score, ArticleTag.id < last_id)
+        ))
+    rows = query.order_by(
+        ArticleTag.relevance_score.desc(),
+        ArticleTag.id.desc()
+    ).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        link_id, relevance_score, _ = rows[-1]
+        next_cursor = _encode_cursor(relevance_score, link_id)
+    
+    results = []
+    for link_id, relevance_score, article in rows:
+        results.append({
+            "id": article.id,
+            "title": article.title,
+            "url": article.url,
+            "source": article.source,
+            "description": article.description,
+            "published_at": article.published_at,
+            "relevance_score": relevance_score
+        })
+    return {"articles": results, "next_cursor": next_cursor}
+
+@app.get("/articles/semantic-search")
+def semantic_search_articles(q: str, k: int = Query(10, ge=1, le=100), db: Session = Depends(get_read_db)):
+    """
+    Stored articles closest in meaning to `q`, from the approximate nearest-neighbour index
+    """
+    matches = semantic_matcher.search_articles(q, k)
+    articles = {
+        article.id: article
+        for article in db.query(Article).filter(Article.id.in_([m['article_id'] for m in matches])).all()
+    }
     results = []
-    for link in links:
-        article = db.query(Article).filter(Article.id == link.article_id).first()
+    for match in matches:
+        article = articles.get(match['article_id'])
         if article:
             results.append({
-                "id": article.id,  # ADD THIS
+                "id": article.id,
                 "title": article.title,
                 "url": article.url,
                 "source": article.source,
                 "description": article.description,
                 "published_at": article.published_at,
-                "relevance_score": link.relevance_score
+                "similarity_score": match['similarity_score']
             })
-    return results  # SIMPLIFIED - just return the list
+    return {"query": q, "articles": results}
 
 @app.get("/news/search-view", response_class=HTMLResponse)
 def search_news_view(keyword: str, page_size: int = 5):
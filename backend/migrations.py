@@ -0,0 +1,92 @@
+# migrations.py
+from typing import List
+from sqlalchemy import func, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from db_utils import chunked
+from models import Base, ArticleTag
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Bring tables created by an older version up to date with models.py.
+    create_all only creates missing tables, so columns and constraints added
+    to existing tables since are added here. Safe to run on every start;
+    returns the changes that were made.
+    """
+    changes = []
+    with engine.begin() as conn:
+        _add_missing_columns(conn, changes)
+        _add_missing_indexes(conn, changes)
+        _add_article_link_uniqueness(conn, changes)
+
+    for change in changes:
+        print(f"🛠️ Schema upgrade: {change}")
+    return changes
+
+def _add_missing_columns(conn: Connection, changes: List[str]) -> None:
+    """ALTER TABLE ... ADD COLUMN for model columns the table lacks (they are all nullable)"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} automatically")
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}"
+            ))
+            changes.append(f"added column {table.name}.{column.name}")
+
+def _add_missing_indexes(conn: Connection, changes: List[str]) -> None:
+    """Create model indexes the table lacks, e.g. the per-tag feed index on article_tags"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+                changes.append(f"added index {index.name}")
+
+def _add_article_link_uniqueness(conn: Connection, changes: List[str]) -> None:
+    """
+    Unique (article_id, tag_id) on article_tags, which link_articles' ON
+    CONFLICT relies on. Older tables can hold duplicate links, so for each
+    pair only the best-scoring (then oldest) row is kept first.
+    """
+    inspector = inspect(conn)
+    columns = ['article_id', 'tag_id']
+    if any(c['column_names'] == columns for c in inspector.get_unique_constraints('article_tags')):
+        return
+    if any(i['unique'] and i['column_names'] == columns for i in inspector.get_indexes('article_tags')):
+        return
+
+    duplicated = conn.execute(
+        ArticleTag.__table__.select().with_only_columns(ArticleTag.article_id, ArticleTag.tag_id)
+        .group_by(ArticleTag.article_id, ArticleTag.tag_id)
+        .having(func.count() > 1)
+    ).all()
+    doomed = []
+    for article_id, tag_id in duplicated:
+        rows = conn.execute(
+            ArticleTag.__table__.select().with_only_columns(ArticleTag.id, ArticleTag.relevance_score)
+            .where(ArticleTag.article_id == article_id, ArticleTag.tag_id == tag_id)
+        ).all()
+        rows.sort(key=lambda row: (-(row.relevance_score or 0.0), row.id))
+        doomed.extend(row.id for row in rows[1:])
+    for chunk in chunked(doomed):
+        conn.execute(ArticleTag.__table__.delete().where(ArticleTag.id.in_(chunk)))
+    if doomed:
+        changes.append(f"removed {len(doomed)} duplicate article_tags rows")
+
+    conn.execute(text(
+        "CREATE UNIQUE INDEX uq_article_tags_article_tag ON article_tags (article_id, tag_id)"
+    ))
+    changes.append("added unique index article_tags(article_id, tag_id)")
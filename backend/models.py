@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Text, Float, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -27,8 +27,13 @@ class Tag(Base):
     priority = Column(Integer, default=1)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Cached embedding of the tag text (float32 bytes) and the content hash it was built from
+    embedding = Column(LargeBinary)
+    embedding_hash = Column(String(64))
+    
     user = relationship('User', back_populates='tags')
     matched_articles = relationship('ArticleTag', back_populates='tag')
+    refresh_state = relationship('TagRefreshState', uselist=False, cascade='all, delete-orphan')
 
 class Article(Base):
     __tablename__ = 'articles'
@@ -43,11 +48,17 @@ class Article(Base):
     image_url = Column(String)
     published_at = Column(DateTime)
     fetched_at = Column(DateTime, default=datetime.utcnow)
+    embedding = Column(LargeBinary)  # float32 bytes of the article text embedding
     
     matched_tags = relationship('ArticleTag', back_populates='article')
 
 class ArticleTag(Base):
     __tablename__ = 'article_tags'
+    __table_args__ = (
+        UniqueConstraint('article_id', 'tag_id', name='uq_article_tags_article_tag'),
+        # Backs the per-tag feed, which is ordered by relevance
+        Index('ix_article_tags_tag_score', 'tag_id', 'relevance_score'),
+    )
     
     id = Column(Integer, primary_key=True)
     article_id = Column(Integer, ForeignKey('articles.id'), nullable=False)
@@ -57,3 +68,53 @@ class ArticleTag(Base):
     
     article = relationship('Article', back_populates='matched_tags')
     tag = relationship('Tag', back_populates='matched_articles')
+
+class TagRefreshState(Base):
+    __tablename__ = 'tag_refresh_state'
+    
+    tag_id = Column(Integer, ForeignKey('tags.id'), primary_key=True)
+    last_refreshed_at = Column(DateTime)
+    last_status = Column(String)  # 'ok' or 'error' (the tag's fetch or the batch's ingestion failed)
+    last_error = Column(Text)
+    articles_fetched = Column(Integer, default=0)
+
+class EmbeddingCache(Base):
+    __tablename__ = 'embedding_cache'
+    
+    # sha256 of model name + embedded text, so one row per (model, text)
+    content_hash = Column(String(64), primary_key=True)
+    model_name = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32 bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ArticleAnalysis(Base):
+    __tablename__ = 'article_analyses'
+    
+    # sha256 of analyzer version + analyzed text, so re-analysis only happens when either changes
+    content_hash = Column(String(64), primary_key=True)
+    analyzer_version = Column(String, nullable=False, index=True)
+    entities = Column(JSON, nullable=False)  # [{text, label, start, end}]
+    keywords = Column(JSON, nullable=False)  # Noun-chunk phrases
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class StoryCluster(Base):
+    __tablename__ = 'story_clusters'
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Allocated by IncrementalClusterer
+    centroid = Column(LargeBinary, nullable=False)  # float32 bytes, mean of member unit vectors
+    member_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    members = relationship('StoryClusterMember', back_populates='cluster')
+
+class StoryClusterMember(Base):
+    __tablename__ = 'story_cluster_members'
+    
+    article_url = Column(String, primary_key=True)
+    cluster_id = Column(Integer, ForeignKey('story_clusters.id'), nullable=False, index=True)
+    embedding = Column(LargeBinary, nullable=False)  # float32 bytes, kept for splitting the cluster later
+    assigned_at = Column(DateTime, default=datetime.utcnow)
+    
+    cluster = relationship('StoryCluster', back_populates='members')
@@ -1,20 +1,349 @@
 # news_fetcher.py
+import asyncio
+import math
+import queue
+import threading
+import time
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from config import Config
-from typing import List, Dict
+from response_cache import ResponseCache
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_request_budget = None
+_request_budget_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """Process-wide keep-alive session, so repeated calls reuse connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=Config.REFRESH_CONCURRENCY
+            )
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide NewsAPI response cache (None when disabled)"""
+    global _response_cache
+    if Config.NEWS_CACHE_TTL_SECONDS <= 0:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                ttl_seconds=Config.NEWS_CACHE_TTL_SECONDS,
+                max_entries=Config.NEWS_CACHE_MAX_ENTRIES,
+                disk_path=Config.NEWS_CACHE_PATH
+            )
+        return _response_cache
+
+class RequestBudget:
+    """
+    Caps NewsAPI requests per time window (e.g. the plan's daily quota),
+    shared by every fetch in the process. A limit of 0 means unlimited.
+    """
+    
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._used = 0
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def try_acquire(self) -> bool:
+        """Reserve one request; False once this window's budget is spent"""
+        if self.limit <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start, self._used = now, 0
+            if self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+    
+    def remaining(self) -> Optional[int]:
+        if self.limit <= 0:
+            return None
+        with self._lock:
+            if time.monotonic() - self._window_start >= self.window_seconds:
+                return self.limit
+            return self.limit - self._used
+
+def get_request_budget() -> RequestBudget:
+    """Process-wide NewsAPI request budget"""
+    global _request_budget
+    with _request_budget_lock:
+        if _request_budget is None:
+            _request_budget = RequestBudget(
+                Config.NEWS_API_REQUEST_BUDGET,
+                Config.NEWS_API_BUDGET_WINDOW_SECONDS
+            )
+        return _request_budget
 
 class NewsFetcher:
     def __init__(self):
         self.api_key = Config.NEWS_API_KEY
         self.base_url = Config.NEWS_API_BASE_URL
-        
+    
     def fetch_by_keyword(self, keyword: str, days_back: int = None) -> List[Dict]:
         """Fetch news articles by keyword"""
-        if days_back is None:
-            days_back = Config.DAYS_BACK
+        url = f"{self.base_url}/everything"
+        params = self._build_params(keyword, days_back)
+        cached = self._get_cached(params, keyword)
+        if cached is not None:
+            return cached
+        if not get_request_budget().try_acquire():
+            print(f"⚠️ NewsAPI request budget spent, skipping '{keyword}'")
+            return []
+        
+        try:
+            response = _get_session().get(url, params=params, timeout=10)
+            response.raise_for_status()
+            return self._handle_response(response.json(), keyword, params)
+        
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching news: {e}")
+            return []
+    
+    async def fetch_by_keyword_async(
+        self,
+        client: httpx.AsyncClient,
+        keyword: str,
+        days_back: int = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> List[Dict]:
+        """
+        Async version of fetch_by_keyword, using a shared pooled client.
+        Failures still return [], and are also recorded as errors[keyword]
+        when an errors dict is passed.
+        """
+        url = f"{self.base_url}/everything"
+        params = self._build_params(keyword, days_back)
+        cached = self._get_cached(params, keyword)
+        if cached is not None:
+            return cached
+        if not get_request_budget().try_acquire():
+            print(f"⚠️ NewsAPI request budget spent, skipping '{keyword}'")
+            if errors is not None:
+                errors[keyword] = "NewsAPI request budget spent"
+            return []
+        
+        try:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+        
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"❌ Error fetching news: {e}")
+            if errors is not None:
+                errors[keyword] = str(e) or type(e).__name__
+            return []
+        
+        if data.get('status') != 'ok' and errors is not None:
+            errors[keyword] = data.get('message', 'Unknown error')
+        return self._handle_response(data, keyword, params)
+    
+    async def iter_pages_async(
+        self,
+        keyword: str,
+        pages: Optional[int] = None,
+        page_size: Optional[int] = None,
+        days_back: int = None,
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Deep fetch: up to `pages` pages of results for a keyword.
+        Page 1 is fetched first to learn how many results exist; the remaining
+        pages are then requested concurrently, and each page's articles are
+        yielded as soon as it arrives, minus URLs already seen on earlier pages
+        (empty pages are not yielded).
+        Every uncached request counts against the request budget; the fetch
+        stops early once it is spent.
+        """
+        pages = pages or Config.DEEP_FETCH_PAGES
+        page_size = page_size or Config.DEEP_FETCH_PAGE_SIZE
+        max_concurrency = max_concurrency or Config.REFRESH_CONCURRENCY
+        seen_urls = set()
+        
+        def unseen(articles: List[Dict]) -> List[Dict]:
+            fresh = [a for a in articles if a['url'] not in seen_urls]
+            seen_urls.update(a['url'] for a in fresh)
+            return fresh
+        
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+            first, raw_count, total = await self._fetch_page_async(client, keyword, days_back, 1, page_size)
+            first = unseen(first)
+            if first:
+                yield first
+            if raw_count is not None and raw_count < page_size:
+                return  # everything fit on page 1
+            last_page = pages if total is None else min(pages, math.ceil(total / page_size))
+            
+            semaphore = asyncio.Semaphore(max_concurrency)
+            
+            async def fetch(page: int):
+                async with semaphore:
+                    return await self._fetch_page_async(client, keyword, days_back, page, page_size)
             
+            tasks = [asyncio.ensure_future(fetch(page)) for page in range(2, last_page + 1)]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    articles = unseen((await next_page)[0])
+                    if articles:  # skipped/failed pages and pages of repeats yield nothing
+                        yield articles
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    def iter_pages(self, keyword: str, max_buffered_pages: int = 2, **options) -> Iterator[List[Dict]]:
+        """
+        Blocking generator over iter_pages_async (same options). Pages are
+        fetched on a background thread, so the caller can process one page
+        while the next ones are still downloading.
+        At most max_buffered_pages pages wait for the caller; once it stops
+        iterating, the fetch is cancelled and no further pages are requested.
+        """
+        pages_queue: "queue.Queue" = queue.Queue(maxsize=max_buffered_pages)
+        stop = threading.Event()
+        done = object()
+        
+        async def produce():
+            pages = self.iter_pages_async(keyword, **options)
+            try:
+                async for page in pages:
+                    # Wait for room without blocking the event loop, so downloads keep going
+                    while True:
+                        if stop.is_set():
+                            return
+                        try:
+                            pages_queue.put_nowait(page)
+                            break
+                        except queue.Full:
+                            await asyncio.sleep(0.05)
+            finally:
+                await pages.aclose()  # cancels the page requests still pending
+        
+        def run():
+            result = done
+            try:
+                asyncio.run(produce())
+            except Exception as e:
+                result = e
+            while not stop.is_set():
+                try:
+                    pages_queue.put(result, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        threading.Thread(target=run, name="newsapi-deep-fetch", daemon=True).start()
+        try:
+            while True:
+                page = pages_queue.get()
+                if page is done:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+        finally:
+            stop.set()
+    
+    async def _fetch_page_async(
+        self,
+        client: httpx.AsyncClient,
+        keyword: str,
+        days_back: Optional[int],
+        page: int,
+        page_size: int
+    ) -> Tuple[List[Dict], Optional[int], Optional[int]]:
+        """One results page: (articles, raw article count, totalResults); counts are None when unknown"""
         url = f"{self.base_url}/everything"
+        params = self._build_params(keyword, days_back, page, page_size)
+        cached = self._get_cached_page(params, keyword)
+        if cached is not None:
+            return cached
+        if not get_request_budget().try_acquire():
+            print(f"⚠️ NewsAPI request budget spent, skipping page {page} of '{keyword}'")
+            return [], 0, None
+        
+        try:
+            response = await client.get(url, params=params)
+            data = response.json()
+            if data.get('status') != 'ok':
+                # e.g. the plan's result limit was reached on a later page
+                print(f"❌ NewsAPI error on page {page}: {data.get('message', 'Unknown error')}")
+                return [], 0, None
+            articles = self._handle_response(data, keyword, params)
+            return articles, len(data['articles']), data.get('totalResults')
+        
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"❌ Error fetching page {page}: {e}")
+            return [], 0, None
+    
+    async def fetch_many_async(
+        self,
+        keywords: List[str],
+        days_back: int = None,
+        max_concurrency: Optional[int] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Fetch several keywords concurrently over one keep-alive connection pool.
+        At most max_concurrency requests are in flight at once.
+        Returns {keyword: articles}; keywords that failed map to [] and, if an
+        errors dict is passed, are added to it as {keyword: message}.
+        """
+        if max_concurrency is None:
+            max_concurrency = Config.REFRESH_CONCURRENCY
+        keywords = list(dict.fromkeys(keywords))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limits = httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency
+        )
+        
+        async with httpx.AsyncClient(limits=limits, timeout=10) as client:
+            async def fetch_one(keyword: str) -> List[Dict]:
+                async with semaphore:
+                    return await self.fetch_by_keyword_async(client, keyword, days_back, errors)
+            
+            results = await asyncio.gather(*(fetch_one(k) for k in keywords))
+        
+        return dict(zip(keywords, results))
+    
+    def fetch_many(
+        self,
+        keywords: List[str],
+        days_back: int = None,
+        max_concurrency: Optional[int] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Blocking wrapper around fetch_many_async, for sync callers"""
+        return asyncio.run(self.fetch_many_async(keywords, days_back, max_concurrency, errors))
+    
+    def _build_params(
+        self,
+        keyword: str,
+        days_back: int = None,
+        page: int = 1,
+        page_size: Optional[int] = None
+    ) -> Dict:
+        """NewsAPI /everything query parameters for a keyword (and results page)"""
+        if days_back is None:
+            days_back = Config.DAYS_BACK
         from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
         params = {
@@ -23,24 +352,49 @@ class NewsFetcher:
             'language': 'en',
             'sortBy': 'publishedAt',
             'from': from_date,
-            'pageSize': Config.MAX_ARTICLES_PER_TAG,
+            'pageSize': page_size or Config.MAX_ARTICLES_PER_TAG,
             'excludeDomains': 'biztoc.com'  # Skip BizToc
         }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['status'] == 'ok':
-                print(f"✅ Fetched {len(data['articles'])} articles for '{keyword}'")
-                return self._process_articles(data['articles'])
-            else:
-                print(f"❌ NewsAPI error: {data.get('message', 'Unknown error')}")
-                return []
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching news: {e}")
+        if page > 1:
+            params['page'] = page
+        return params
+    
+    def _cache_key(self, params: Dict) -> str:
+        """Cache key from the query parameters, leaving out the API key"""
+        return ResponseCache.make_key({k: v for k, v in params.items() if k != 'apiKey'})
+    
+    def _get_cached(self, params: Dict, keyword: str) -> Optional[List[Dict]]:
+        """Processed articles from the response cache, or None on a miss"""
+        cached = self._get_cached_page(params, keyword)
+        return None if cached is None else cached[0]
+    
+    def _get_cached_page(self, params: Dict, keyword: str) -> Optional[Tuple[List[Dict], int, Optional[int]]]:
+        """(processed articles, raw article count, totalResults) from the response cache, or None on a miss"""
+        cache = get_response_cache()
+        if cache is None:
+            return None
+        entry = cache.get(self._cache_key(params))
+        if entry is None:
+            return None
+        if isinstance(entry, list):  # cached before totalResults was kept
+            entry = {'articles': entry, 'totalResults': None}
+        raw_articles = entry['articles']
+        print(f"⚡ Cached {len(raw_articles)} articles for '{keyword}'")
+        return self._process_articles(raw_articles), len(raw_articles), entry['totalResults']
+    
+    def _handle_response(self, data: Dict, keyword: str, params: Dict) -> List[Dict]:
+        """Turn a NewsAPI response body into processed articles, caching successes"""
+        if data['status'] == 'ok':
+            print(f"✅ Fetched {len(data['articles'])} articles for '{keyword}'")
+            cache = get_response_cache()
+            if cache is not None:
+                cache.set(self._cache_key(params), {
+                    'articles': data['articles'],
+                    'totalResults': data.get('totalResults')
+                })
+            return self._process_articles(data['articles'])
+        else:
+            print(f"❌ NewsAPI error: {data.get('message', 'Unknown error')}")
             return []
     
     def _process_articles(self, articles: List[Dict]) -> List[Dict]:
@@ -0,0 +1,116 @@
+# response_cache.py
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+class ResponseCache:
+    """
+    TTL + LRU cache for JSON-serializable API responses.
+    Entries expire after ttl_seconds, and the least recently used entry is
+    evicted once max_entries is reached. If disk_path is set, entries are also
+    written to a small SQLite file so the cache survives restarts.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, disk_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache ("
+                    "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """
+        Normalized key for a set of request parameters: sorted, with runs of
+        whitespace in string values collapsed, so equivalent queries share an
+        entry. Case is kept: NewsAPI's AND/OR/NOT operators are case-sensitive.
+        """
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = " ".join(value.split())
+            normalized[name] = value
+        return json.dumps(normalized, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.disk_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, value FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None and row[0] > now:
+                value = json.loads(row[1])
+                self._remember(key, row[0], value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, value)
+        if self.disk_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(value))
+                )
+                self._evict_disk(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _evict_disk(self, conn: sqlite3.Connection) -> None:
+        """Drop expired rows, then the soonest-expiring rows beyond max_entries"""
+        conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM response_cache WHERE key NOT IN ("
+            "SELECT key FROM response_cache ORDER BY expires_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.disk_path, timeout=5)
+        try:
+            with conn:  # commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
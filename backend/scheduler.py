@@ -0,0 +1,164 @@
+# scheduler.py
+
+import threading
+import traceback
+import numpy as np
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from ai_pipeline.vectors import l2_normalize
+from config import Config
+from database import SessionLocal
+from ingestion import ingest_and_match
+from models import Tag, TagRefreshState
+from news_fetcher import NewsFetcher
+
+class IngestionScheduler:
+    """
+    Background news ingestion, so API reads never wait on NewsAPI or the model.
+    Each cycle picks the tags that are due (highest priority first, then least
+    recently refreshed), fetches each distinct tag name once no matter how many
+    users track it, matches everything in one batched pass and records
+    per-tag refresh state.
+    """
+
+    def __init__(
+        self,
+        matcher,
+        tag_store,
+        interval_seconds: int = None,
+        batch_size: int = None,
+        session_factory=SessionLocal
+    ):
+        self.matcher = matcher
+        self.tag_store = tag_store
+        self.interval_seconds = interval_seconds or Config.SCHEDULER_INTERVAL_SECONDS
+        self.batch_size = batch_size or Config.SCHEDULER_BATCH_SIZE
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Run the scheduler on a daemon thread inside this process"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="ingestion-scheduler", daemon=True)
+        self._thread.start()
+        print(f"⏰ Ingestion scheduler started (every {self.interval_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+
+    def run_forever(self) -> None:
+        """Refresh due tags until stopped. A full batch means more work is waiting, so loop right away."""
+        idle_wait = min(60, self.interval_seconds)
+        while not self._stop.is_set():
+            try:
+                summary = self.run_once()
+            except Exception:
+                traceback.print_exc()
+                summary = {"tags": 0}
+            if summary["tags"] < self.batch_size:
+                self._stop.wait(idle_wait)
+
+    def run_once(self) -> Dict:
+        """Refresh one batch of due tags"""
+        db = self.session_factory()
+        try:
+            tags = self._due_tags(db)
+            if not tags:
+                return {"tags": 0, "queries": 0, "fetch_errors": 0, "status": "ok",
+                        "fetched": 0, "new_articles": 0, "matched_articles": 0}
+
+            # One NewsAPI query per distinct tag name, shared by every tag with that name
+            groups = OrderedDict()
+            for tag in tags:
+                groups.setdefault(self._query_key(tag.tag_name), []).append(tag)
+            queries = {key: group[0].tag_name for key, group in groups.items()}
+            fetch_errors = {}
+            results = NewsFetcher().fetch_many(list(queries.values()), errors=fetch_errors)
+            articles_by_key = {key: results.get(name, []) for key, name in queries.items()}
+            articles = [article for batch in articles_by_key.values() for article in batch]
+
+            # Embed stale tags before the ingestion transaction starts writing
+            if self.tag_store.embed_tags(tags):
+                db.commit()
+            tag_matrix = l2_normalize(
+                np.vstack([np.frombuffer(tag.embedding, dtype=np.float32) for tag in tags])
+            )
+
+            status, error = 'ok', None
+            saved_count = matched_count = 0
+            try:
+                saved_count, matched_count = ingest_and_match(
+                    db, self.matcher, articles, [tag.id for tag in tags],
+                    tag_matrix, Config.SIMILARITY_THRESHOLD
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                status, error = 'error', str(e)
+                print(f"❌ Scheduled ingestion failed: {e}")
+
+            now = datetime.utcnow()
+            for key, group in groups.items():
+                # A tag whose own query failed is an error even if the batch was stored
+                fetch_error = fetch_errors.get(queries[key])
+                for tag in group:
+                    db.merge(TagRefreshState(
+                        tag_id=tag.id,
+                        last_refreshed_at=now,
+                        last_status='error' if fetch_error else status,
+                        last_error=fetch_error or error,
+                        articles_fetched=len(articles_by_key[key])
+                    ))
+            db.commit()
+
+            if status == 'ok' and fetch_errors:
+                status = 'error' if len(fetch_errors) == len(queries) else 'partial'
+            print(f"⏰ Refreshed {len(tags)} tags with {len(queries)} queries ({len(fetch_errors)} failed): "
+                  f"{saved_count} new articles, {matched_count} new matches")
+            return {
+                "tags": len(tags),
+                "queries": len(queries),
+                "fetch_errors": len(fetch_errors),
+                "status": status,
+                "fetched": len(articles),
+                "new_articles": saved_count,
+                "matched_articles": matched_count
+            }
+        finally:
+            db.close()
+
+    def _due_tags(self, db) -> List[Tag]:
+        """Tags never refreshed or refreshed longer than one interval ago, in priority order"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.interval_seconds)
+        return db.query(Tag).outerjoin(
+            TagRefreshState, TagRefreshState.tag_id == Tag.id
+        ).filter(
+            TagRefreshState.last_refreshed_at.is_(None) | (TagRefreshState.last_refreshed_at < cutoff)
+        ).order_by(
+            Tag.priority.desc(),
+            TagRefreshState.last_refreshed_at.asc().nulls_first(),
+            Tag.id
+        ).limit(self.batch_size).all()
+
+    @staticmethod
+    def _query_key(tag_name: str) -> str:
+        return " ".join(tag_name.lower().split())
+
+
+if __name__ == "__main__":
+    # Standalone worker: python scheduler.py
+    from database import init_db
+    from semantic_matcher import create_semantic_matcher
+    from tag_embeddings import TagEmbeddingStore
+
+    init_db()
+    # Same settings as the API, so articles land in the same embedding store
+    matcher = create_semantic_matcher()
+    IngestionScheduler(matcher, TagEmbeddingStore(matcher)).run_forever()
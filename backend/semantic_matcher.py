@@ -1,19 +1,89 @@
 # semantic_matcher.py
 
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from typing import List, Dict
+from typing import Iterator, List, Dict, Tuple, Union
+
+from ai_pipeline.model_registry import embedding_name, registry
+from ai_pipeline.vectors import l2_normalize
+from config import Config
+from db_utils import query_in
+from embedding_cache import EmbeddingCache
+from embedding_worker import EmbeddingBatcher
+from models import Article
+from vector_index import IVFIndex
+from embedding_store import MemmapEmbeddingStore
+
+# Articles read per batch when building the index from the database
+INDEX_LOAD_BATCH_SIZE = 5000
 
 class SemanticMatcher:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        backend: str = 'torch',
+        onnx_file: str = None,
+        use_cache: bool = True,
+        use_batching: bool = False,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10,
+        article_store_path: str = None,
+        article_store_dtype: str = 'int8'
+    ):
         """
         Initialize semantic matcher with a pre-trained model.
         all-MiniLM-L6-v2 is fast, small, and accurate for news matching.
+        backend selects how it runs on CPU ('torch', 'onnx' or 'int8', see
+        ModelRegistry.sentence_transformer); benchmark_backends.py measures
+        their speed and agreement with 'torch'.
+        With use_cache, embeddings are persisted by content hash so
+        previously seen texts skip the model entirely.
+        The model itself comes from the shared registry and is loaded on
+        first use (or by registry.warm_up), not here.
+        With use_batching, encode calls from concurrent requests are coalesced
+        by a single EmbeddingBatcher worker instead of competing for the model.
+        With article_store_path, article embeddings are also kept in a
+        quantized, memory-mapped MemmapEmbeddingStore, which the ANN index
+        then searches (rescoring its best candidates at float32) instead
+        of holding every vector in RAM.
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        # Cached vectors (and tag embedding hashes) are keyed per backend and
+        # ONNX file, so switching either never reuses vectors from the other
+        self.embedding_name = embedding_name(model_name, backend, onnx_file)
+        self.cache = EmbeddingCache(self.embedding_name) if use_cache else None
+        self.batcher = None
+        if use_batching:
+            self.batcher = EmbeddingBatcher(
+                lambda texts: self.model.encode(texts, convert_to_numpy=True),
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms
+            )
+        self.article_store = None
+        if article_store_path:
+            self.article_store = MemmapEmbeddingStore(article_store_path, dtype=article_store_dtype)
+        # With a store the index keeps ids only and searches the memmap
+        self.article_index = IVFIndex(store=self.article_store)
+        self.index_loaded = False
+    
+    @property
+    def model(self):
+        return registry.sentence_transformer(self.model_name, self.backend, self.onnx_file)
+    
+    @property
+    def is_ready(self) -> bool:
+        """True once the model is loaded, so encoding won't block on a load"""
+        return registry.is_ready(registry.sentence_transformer_key(self.model_name, self.backend, self.onnx_file))
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
         """
-        print(f"Loading semantic model: {model_name}...")
-        self.model = SentenceTransformer(model_name)
-        print("✅ Semantic model loaded!")
+        Encode texts, through the micro-batching worker when enabled.
+        """
+        if self.batcher is not None:
+            return self.batcher.encode_many(texts)
+        return self.model.encode(texts, convert_to_numpy=True)
     
     def get_embedding(self, text: str) -> np.ndarray:
         """
@@ -21,14 +91,39 @@ class SemanticMatcher:
         """
         if not text or not text.strip():
             return np.zeros(384)  # Return zero vector for empty text
-        return self.model.encode(text, convert_to_numpy=True)
+        if self.cache is None:
+            return self._encode([text])[0]
+        key = self.cache.key(text)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        embedding = self._encode([text])[0]
+        self.cache.put_many({key: embedding})
+        return embedding
     
     def get_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """
         Convert multiple texts to embeddings (more efficient).
+        Cached texts are served from the store; only misses are encoded.
         """
         valid_texts = [t if t and t.strip() else " " for t in texts]
-        return self.model.encode(valid_texts, convert_to_numpy=True)
+        if self.cache is None or not valid_texts:
+            return self._encode(valid_texts)
+        
+        keys = [self.cache.key(t) for t in valid_texts]
+        embeddings = self.cache.get_many(keys)
+        
+        missing = {}
+        for key, text in zip(keys, valid_texts):
+            if key not in embeddings:
+                missing[key] = text
+        if missing:
+            encoded = self._encode(list(missing.values()))
+            new_embeddings = dict(zip(missing.keys(), encoded))
+            self.cache.put_many(new_embeddings)
+            embeddings.update(new_embeddings)
+        
+        return np.vstack([embeddings[key] for key in keys])
     
     def calculate_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
@@ -40,6 +135,48 @@ class SemanticMatcher:
         similarity = cosine_similarity(emb1, emb2)[0][0]
         return float(similarity)
     
+    def match_articles_to_tags(
+        self,
+        article_texts: List[str],
+        tag_texts: List[str],
+        threshold: float = 0.3
+    ) -> List[Dict]:
+        """
+        Score a block of articles against a block of tags and return matches above threshold.
+        Returns a list of dicts with {article_index, tag_index, similarity_score}.
+        """
+        if not article_texts or not tag_texts:
+            return []
+        tag_matrix = l2_normalize(self.get_embeddings_batch(tag_texts))
+        return self.match_articles_to_tag_matrix(article_texts, tag_matrix, threshold)
+    
+    def match_articles_to_tag_matrix(
+        self,
+        article_texts: List[str],
+        tag_matrix: np.ndarray,
+        threshold: float = 0.3
+    ) -> List[Dict]:
+        """
+        Like match_articles_to_tags, but against precomputed, normalized tag embeddings,
+        so only the articles go through the model.
+        """
+        if not article_texts or len(tag_matrix) == 0:
+            return []
+        article_matrix = l2_normalize(self.get_embeddings_batch(article_texts))
+        # Empty articles score 0 against every tag, as get_embedding's zero vector does
+        empty = [i for i, text in enumerate(article_texts) if not text or not text.strip()]
+        article_matrix[empty] = 0.0
+        scores = article_matrix @ tag_matrix.T
+        article_idx, tag_idx = np.nonzero(scores >= threshold)
+        return [
+            {
+                'article_index': int(a),
+                'tag_index': int(t),
+                'similarity_score': float(scores[a, t])
+            }
+            for a, t in zip(article_idx, tag_idx)
+        ]
+    
     def match_article_to_tags(
         self, 
         article_text: str, 
@@ -50,19 +187,86 @@ class SemanticMatcher:
         Match an article to multiple tags and return matches above threshold.
         Returns a list of dicts with {tag_index, similarity_score}.
         """
-        article_embedding = self.get_embedding(article_text)
-        tag_embeddings = self.get_embeddings_batch(tag_texts)
-        matches = []
-        for idx, tag_embedding in enumerate(tag_embeddings):
-            similarity = self.calculate_similarity(article_embedding, tag_embedding)
-            if similarity >= threshold:
-                matches.append({
-                    'tag_index': idx,
-                    'similarity_score': similarity
-                })
+        matches = [
+            {'tag_index': m['tag_index'], 'similarity_score': m['similarity_score']}
+            for m in self.match_articles_to_tags([article_text], tag_texts, threshold)
+        ]
         matches.sort(key=lambda x: x['similarity_score'], reverse=True)
         return matches
     
+    def index_articles(self, article_ids: List[int], embeddings: np.ndarray) -> int:
+        """
+        Add article embeddings to the ANN index (and the on-disk store, if any).
+        Already-indexed ids are skipped. Only call this for committed articles:
+        the store is append-only.
+        """
+        if self.article_store is not None:
+            self.article_store.append(article_ids, embeddings)
+        return self.article_index.add(article_ids, embeddings)
+    
+    def load_article_index(self, db) -> int:
+        """
+        Index every stored article embedding, streaming rows in batches.
+        With an on-disk store, only articles missing from it are read from
+        the database; everything else is loaded straight from the memmap.
+        """
+        for article_ids, embeddings in self.iter_db_embeddings(db, INDEX_LOAD_BATCH_SIZE, skip_stored=True):
+            self.index_articles(article_ids, embeddings)
+        
+        if self.article_store is not None:
+            for ids, vectors in self.article_store.iter_chunks(INDEX_LOAD_BATCH_SIZE):
+                self.article_index.add(ids.tolist(), vectors)
+        self.index_loaded = True
+        print(f"✅ Article index holds {len(self.article_index)} articles")
+        return len(self.article_index)
+    
+    def iter_db_embeddings(
+        self,
+        db,
+        chunk_size: int = INDEX_LOAD_BATCH_SIZE,
+        skip_stored: bool = False
+    ) -> Iterator[Tuple[List[int], np.ndarray]]:
+        """
+        Yield (article ids, float32 embeddings) for articles in the database
+        that have an embedding, in id-ordered chunks.
+        With skip_stored, articles already in the on-disk store are left out.
+        They are matched by id, not by the store's highest id: ids can commit
+        out of order, and a process without the store may have added rows.
+        """
+        skip_stored = skip_stored and self.article_store is not None
+        last_id = 0
+        while True:
+            query = db.query(Article.id) if skip_stored else db.query(Article.id, Article.embedding)
+            rows = query.filter(
+                Article.id > last_id,
+                Article.embedding.isnot(None)
+            ).order_by(Article.id).limit(chunk_size).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            
+            if skip_stored:
+                # Only the blobs of articles missing from the store are read
+                missing = self.article_store.missing([row[0] for row in rows])
+                rows = query_in(db.query(Article.id, Article.embedding).order_by(Article.id), Article.id, missing)
+                if not rows:
+                    continue
+            yield (
+                [article_id for article_id, _ in rows],
+                np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+            )
+    
+    def search_articles(self, query: Union[str, np.ndarray], k: int = 10) -> List[Dict]:
+        """
+        Top-k stored articles most similar to a text or embedding, via the ANN index.
+        Returns a list of dicts with {article_id, similarity_score}, best first.
+        """
+        embedding = self.get_embedding(query) if isinstance(query, str) else query
+        return [
+            {'article_id': article_id, 'similarity_score': score}
+            for article_id, score in self.article_index.search(embedding, k)
+        ]
+    
     def create_tag_text(self, tag_name: str, keywords: List[str], category: str = "") -> str:
         """
         Combine tag information into text for embedding.
@@ -87,3 +291,21 @@ class SemanticMatcher:
         if content:
             parts.append(content[:500])  # Limit length
         return " ".join(parts)
+
+
+def create_semantic_matcher() -> SemanticMatcher:
+    """
+    SemanticMatcher configured from Config. The API and the standalone
+    scheduler both use this, so they share one embedding cache and store.
+    """
+    return SemanticMatcher(
+        Config.SEMANTIC_MODEL,
+        backend=Config.SEMANTIC_BACKEND,
+        onnx_file=Config.SEMANTIC_ONNX_FILE,
+        use_cache=Config.EMBEDDING_CACHE_ENABLED,
+        use_batching=Config.EMBEDDING_BATCHING,
+        max_batch_size=Config.EMBEDDING_MAX_BATCH_SIZE,
+        max_wait_ms=Config.EMBEDDING_MAX_WAIT_MS,
+        article_store_path=Config.EMBEDDING_STORE_PATH,
+        article_store_dtype=Config.EMBEDDING_STORE_DTYPE
+    )
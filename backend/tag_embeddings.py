@@ -0,0 +1,136 @@
+# tag_embeddings.py
+
+import threading
+import weakref
+import numpy as np
+from typing import Dict, List, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ai_pipeline.vectors import l2_normalize
+from embedding_cache import content_hash
+from models import Tag
+
+# Tag fields that feed create_tag_text; changing any of them makes the embedding stale
+EMBEDDED_FIELDS = ('tag_name', 'keywords', 'category')
+
+# Every live TagEmbeddingStore, so the session hooks below can reach their caches
+_stores = weakref.WeakSet()
+
+@event.listens_for(Session, 'after_flush')
+def _collect_tag_users(session, flush_context):
+    """Remember whose tags this transaction adds, edits or deletes"""
+    users = session.info.setdefault('tag_users', set())
+    for target in list(session.new) + list(session.deleted):
+        if isinstance(target, Tag):
+            users.add(target.user_id)
+    for target in session.dirty:
+        if not isinstance(target, Tag):
+            continue
+        state = inspect(target)
+        if state.attrs.user_id.history.has_changes() or any(
+            state.attrs[field].history.has_changes() for field in EMBEDDED_FIELDS
+        ):
+            users.add(target.user_id)
+            users.update(state.attrs.user_id.history.deleted or ())
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    """Drop the cached matrices of those users once the change is visible to other sessions"""
+    for user_id in session.info.pop('tag_users', ()):
+        for store in list(_stores):
+            store.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_tag_users(session):
+    session.info.pop('tag_users', None)
+
+class TagEmbeddingStore:
+    """
+    Precomputed tag embeddings.
+    Each tag's raw embedding is persisted on its row (Tag.embedding), and each
+    user's tags are kept in memory as one contiguous, normalized float32 matrix
+    so matching only has to encode the article side.
+
+    A cached matrix is dropped when this process commits a change to the
+    user's tags, and is checked against the tag rows (ids and text hashes,
+    no embeddings) on every use, so edits made by another process, e.g. the
+    scheduler, are picked up too.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self._matrices: Dict[int, Tuple[List[Tuple[int, str]], List[int], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        _stores.add(self)
+
+    def tag_text(self, tag: Tag) -> str:
+        return self.matcher.create_tag_text(tag.tag_name, tag.keywords or [], tag.category or "")
+
+    def embed_tags(self, tags: List[Tag]) -> bool:
+        """
+        Compute embeddings for tags whose stored embedding is missing or stale.
+        All stale tags are encoded in one batch. Returns True if any row changed
+        (the caller owns the commit).
+        """
+        stale = []
+        for tag in tags:
+            text = self.tag_text(tag)
+            text_hash = content_hash(self.matcher.embedding_name, text)
+            if tag.embedding is None or tag.embedding_hash != text_hash:
+                stale.append((tag, text, text_hash))
+        if not stale:
+            return False
+
+        embeddings = self.matcher.get_embeddings_batch([text for _, text, _ in stale])
+        for (tag, _, text_hash), embedding in zip(stale, embeddings):
+            tag.embedding = np.asarray(embedding, dtype=np.float32).tobytes()
+            tag.embedding_hash = text_hash
+        return True
+
+    def tag_vector(self, tag: Tag) -> np.ndarray:
+        """
+        Raw embedding for a single tag, computing it if needed.
+        """
+        self.embed_tags([tag])
+        return np.frombuffer(tag.embedding, dtype=np.float32)
+
+    def user_matrix(self, db: Session, user_id: int) -> Tuple[List[int], np.ndarray]:
+        """
+        Return (tag_ids, matrix) for a user, where matrix[i] is the normalized
+        embedding of tag_ids[i]. Built once and served from memory while the
+        user's tag ids and text hashes still match the database.
+        """
+        rows = db.query(Tag.id, *(getattr(Tag, field) for field in EMBEDDED_FIELDS)).filter(
+            Tag.user_id == user_id
+        ).order_by(Tag.id).all()
+        current = [
+            (tag_id, content_hash(
+                self.matcher.embedding_name,
+                self.matcher.create_tag_text(tag_name, keywords or [], category or "")
+            ))
+            for tag_id, tag_name, keywords, category in rows
+        ]
+        with self._lock:
+            cached = self._matrices.get(user_id)
+        if cached is not None and cached[0] == current:
+            return cached[1], cached[2]
+
+        tags = db.query(Tag).filter(Tag.user_id == user_id).order_by(Tag.id).all()
+        if self.embed_tags(tags):
+            db.commit()
+
+        tag_ids = [tag.id for tag in tags]
+        if tags:
+            raw = np.vstack([np.frombuffer(tag.embedding, dtype=np.float32) for tag in tags])
+            matrix = l2_normalize(raw)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        with self._lock:
+            self._matrices[user_id] = ([(tag.id, tag.embedding_hash) for tag in tags], tag_ids, matrix)
+        return tag_ids, matrix
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._matrices.pop(user_id, None)
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Backend modules use flat imports (from models import ...), as when run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the test run away from ./cognos.db and ./embedding_store; set before config is imported
+_tmp = tempfile.mkdtemp(prefix="cognos-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/cognos.db"
+os.environ["EMBEDDING_STORE_PATH"] = ""
+os.environ.setdefault("NEWS_API_KEY", "test-key")
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """sessionmaker on a fresh SQLite file with the schema, user 1 and tags 1 (AI) and 2 (Space)"""
+    from models import Base, Tag, User  # after the environment above is set
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'cognos.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(User(id=1, email='a@example.com', name='A'))
+    db.add_all([Tag(id=1, user_id=1, tag_name='AI'), Tag(id=2, user_id=1, tag_name='Space')])
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
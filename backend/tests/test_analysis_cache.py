@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from ai_pipeline import article_analyzer
+from ai_pipeline.article_analyzer import ArticleAnalyzer
+from analysis_cache import AnalysisCache
+
+class FakeEmbedder:
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+class FakeEnt:
+    def __init__(self, text):
+        self.text, self.label_, self.start_char, self.end_char = text, 'ORG', 0, len(text)
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+class FakeDoc:
+    def __init__(self, text):
+        words = text.split()
+        self.ents = [FakeEnt(words[0])]
+        self.noun_chunks = [FakeChunk(word) for word in words]
+
+class FakeNLP:
+    pipe_names = ['tok2vec', 'ner', 'lemmatizer']
+    meta = {'version': '3.0.0'}
+
+    def __init__(self):
+        self.parsed = []
+
+    def pipe(self, texts, batch_size=64, n_process=1, disable=()):
+        for text in texts:
+            self.parsed.append(text)
+            yield FakeDoc(text)
+
+@pytest.fixture
+def analysis_cache(session_factory):
+    return AnalysisCache(session_factory=session_factory)
+
+@pytest.fixture
+def nlp(monkeypatch):
+    nlp = FakeNLP()
+    monkeypatch.setattr(article_analyzer.registry, 'sentence_transformer', lambda *args: FakeEmbedder())
+    monkeypatch.setattr(article_analyzer.registry, 'spacy', lambda name: nlp)
+    return nlp
+
+def articles(*texts):
+    return [{'full_text': text} for text in texts]
+
+def test_second_analysis_of_the_same_text_skips_the_parse(nlp, analysis_cache):
+    first = ArticleAnalyzer(analysis_cache=analysis_cache).analyze_batch(articles("OpenAI ships agents"))
+    assert nlp.parsed == ["OpenAI ships agents"]
+
+    # A new analyzer (i.e. a later run) reuses the stored result
+    second = ArticleAnalyzer(analysis_cache=analysis_cache).analyze_batch(
+        articles("OpenAI ships agents", "Nvidia earnings beat")
+    )
+    assert nlp.parsed == ["OpenAI ships agents", "Nvidia earnings beat"]
+    assert second[0]['entities'] == first[0]['entities']
+    assert second[0]['keywords'] == ['openai', 'ships', 'agents']
+    assert second[1]['entities'][0]['text'] == 'Nvidia'
+
+def test_new_analyzer_version_parses_again(nlp, analysis_cache):
+    ArticleAnalyzer(analysis_cache=analysis_cache).analyze_batch(articles("OpenAI ships agents"))
+    nlp.meta = {'version': '3.1.0'}
+    ArticleAnalyzer(analysis_cache=analysis_cache).analyze_batch(articles("OpenAI ships agents"))
+    assert len(nlp.parsed) == 2
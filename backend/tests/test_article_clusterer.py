@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from ai_pipeline.article_clusterer import ArticleClusterer, IncrementalClusterer
+
+def topic_articles(n_topics=4, per_topic=6, dim=32, noise=0.05, seed=0):
+    """Articles tightly grouped around orthogonal topic directions"""
+    rng = np.random.default_rng(seed)
+    topics = np.linalg.qr(rng.normal(size=(dim, n_topics)))[0].T
+    return [
+        {'url': f"https://news.example.com/{t}/{i}", 'embedding': topics[t] + noise * rng.normal(size=dim)}
+        for t in range(n_topics) for i in range(per_topic)
+    ]
+
+def partition(clusters):
+    return {frozenset(a['url'] for a in cluster['articles']) for cluster in clusters}
+
+def unit(degrees):
+    radians = np.radians(degrees)
+    return np.array([np.cos(radians), np.sin(radians)])
+
+def test_graph_matches_agglomerative_on_well_separated_topics():
+    articles = topic_articles()
+    graph = ArticleClusterer(method='graph').cluster_articles(articles)
+    agglomerative = ArticleClusterer(method='agglomerative').cluster_articles(articles)
+    assert len(graph) == 4
+    assert partition(graph) == partition(agglomerative)
+
+@pytest.mark.parametrize("embeddings, expected", [
+    ([unit(0)], 1),
+    ([unit(0), unit(10)], 1),
+    ([unit(0), unit(90)], 2),
+])
+def test_graph_labels_on_one_or_two_articles(embeddings, expected):
+    labels = ArticleClusterer(method='graph')._graph_labels(np.array(embeddings))
+    assert len(labels) == len(embeddings)
+    assert len(set(labels)) == expected
+
+def test_graph_labels_without_edges_above_threshold():
+    embeddings = np.eye(5)
+    labels = ArticleClusterer(method='graph', similarity_threshold=0.5)._graph_labels(embeddings)
+    assert len(set(labels)) == 5
+
+def test_graph_keeps_only_mutual_neighbours():
+    # a's nearest is b, but b's nearest is c (and c's is b): only b-c is mutual
+    a, b, c = unit(25), unit(10), unit(0)
+    labels = ArticleClusterer(method='graph', n_neighbors=1)._graph_labels(np.array([a, b, c]))
+    assert labels[1] == labels[2]
+    assert labels[0] != labels[1]
+
+@pytest.mark.parametrize("threshold", [-1.0, 0.9])  # dense and sparse branches
+def test_top_k_above_threshold_matches_brute_force(threshold):
+    sims = np.random.default_rng(1).uniform(-1, 1, size=(20, 50))
+    k = 3
+    rows, cols, values = ArticleClusterer(similarity_threshold=threshold)._top_k_above_threshold(sims, k)
+
+    expected = set()
+    for row in range(len(sims)):
+        best = np.argsort(-sims[row])[:k]
+        expected |= {(row, int(col)) for col in best if sims[row, col] >= threshold}
+    assert set(zip(rows.tolist(), cols.tolist())) == expected
+    assert np.allclose(values, sims[rows, cols])
+
+def test_incremental_assignment_follows_the_threshold():
+    clusterer = IncrementalClusterer(similarity_threshold=0.9)
+    clusterer.add_articles([{'url': 'a', 'embedding': unit(0)}])
+    # cos(20°) = 0.94 joins the cluster, cos(40°) = 0.77 to the new centroid does not
+    clusterer.add_articles([{'url': 'b', 'embedding': unit(20)}, {'url': 'c', 'embedding': unit(50)}])
+    members = clusterer.store.existing_members(['a', 'b', 'c'])
+    assert members['a'] == members['b'] != members['c']
+    assert len(clusterer) == 2
+    assert sorted(clusterer.counts.tolist()) == [1, 2]
+
+def test_incremental_keeps_the_cluster_of_known_articles():
+    clusterer = IncrementalClusterer(similarity_threshold=0.9)
+    first = clusterer.add_articles([{'url': 'a', 'embedding': unit(0)}])[0]['cluster_id']
+    # Same url with a different embedding: already clustered, so not reassigned
+    article = {'url': 'a', 'embedding': unit(90)}
+    clusterer.add_articles([article])
+    assert article['cluster_id'] == first
+    assert len(clusterer) == 1
+
+def test_oversized_cluster_is_split():
+    articles = topic_articles(n_topics=2, per_topic=6)
+    clusterer = IncrementalClusterer(similarity_threshold=-1.0, max_cluster_size=8)
+    clusterer.add_articles(articles)
+
+    assert len(clusterer) == 2
+    assert sorted(clusterer.counts.tolist()) == [6, 6]
+    # Each topic ends up in its own cluster, and articles report where they moved
+    by_topic = {}
+    for article in articles:
+        by_topic.setdefault(article['url'].split('/')[-2], set()).add(article['cluster_id'])
+    assert all(len(ids) == 1 for ids in by_topic.values())
+    assert by_topic['0'] != by_topic['1']
+    assert clusterer.store.existing_members([a['url'] for a in articles]) == {
+        a['url']: a['cluster_id'] for a in articles
+    }
+
+def reference_stats(clusters):
+    """cluster_stats the slow way, from pairwise cosine similarities"""
+    stats = []
+    centroids = []
+    for cluster in clusters:
+        embeddings = np.array([a['embedding'] for a in cluster['articles']])
+        sims = cosine_similarity(embeddings)
+        n = len(embeddings)
+        unit_rows = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        centroid = unit_rows.mean(axis=0)
+        centroid /= np.linalg.norm(centroid)
+        centroids.append(centroid)
+        stats.append({
+            'coherence': (sims.sum() - n) / (n * (n - 1)) if n > 1 else 1.0,
+            # Total similarity to the other members; the medoid has the max (ties possible)
+            'medoid_scores': {id(a): score for a, score in zip(cluster['articles'], sims.sum(axis=1) - 1)},
+            'spread': float(np.mean(1 - cosine_similarity(embeddings, centroid[None, :]))),
+        })
+    between = cosine_similarity(np.array(centroids))
+    np.fill_diagonal(between, -np.inf)
+    for i, entry in enumerate(stats):
+        if len(clusters) > 1:
+            nearest = int(np.argmax(between[i]))
+            entry['nearest_cluster_id'] = clusters[nearest]['cluster_id']
+            entry['nearest_cluster_similarity'] = between[i, nearest]
+        else:
+            entry['nearest_cluster_id'] = entry['nearest_cluster_similarity'] = None
+    return stats
+
+def clusters_of(articles, sizes):
+    clusters, start = [], 0
+    for cluster_id, size in enumerate(sizes):
+        clusters.append({'cluster_id': 10 + cluster_id, 'articles': articles[start:start + size], 'size': size})
+        start += size
+    return clusters
+
+def assert_matches_reference(clusters):
+    stats = ArticleClusterer().cluster_stats(clusters)
+    assert len(stats) == len(clusters)
+    for got, expected, cluster in zip(stats, reference_stats(clusters), clusters):
+        assert got['cluster_id'] == cluster['cluster_id']
+        assert got['size'] == len(cluster['articles'])
+        assert got['coherence'] == pytest.approx(expected['coherence'], abs=1e-5)
+        scores = expected['medoid_scores']
+        assert scores[id(got['representative'])] == pytest.approx(max(scores.values()), abs=1e-5)
+        assert got['spread'] == pytest.approx(expected['spread'], abs=1e-5)
+        assert np.linalg.norm(got['centroid']) == pytest.approx(1.0, abs=1e-5)
+        assert got['nearest_cluster_id'] == expected['nearest_cluster_id']
+        if expected['nearest_cluster_similarity'] is None:
+            assert got['nearest_cluster_similarity'] is None
+        else:
+            assert got['nearest_cluster_similarity'] == pytest.approx(expected['nearest_cluster_similarity'], abs=1e-5)
+
+def test_cluster_stats_match_pairwise_reference():
+    # Noisy topics, with unnormalized embeddings
+    articles = topic_articles(n_topics=4, per_topic=7, noise=0.4, seed=3)
+    for i, article in enumerate(articles):
+        article['embedding'] = article['embedding'] * (1 + i % 3)
+    assert_matches_reference(clusters_of(articles, [7, 7, 7, 7]))
+
+def test_cluster_stats_with_singleton_clusters():
+    articles = topic_articles(n_topics=3, per_topic=3, noise=0.3, seed=4)
+    clusters = clusters_of(articles, [1, 5, 1, 2])
+    assert_matches_reference(clusters)
+    singleton = ArticleClusterer().cluster_stats(clusters)[0]
+    assert singleton['coherence'] == 1.0
+    assert singleton['spread'] == pytest.approx(0.0, abs=1e-6)
+    assert singleton['representative'] is articles[0]
+
+def test_cluster_stats_with_one_cluster():
+    articles = topic_articles(n_topics=1, per_topic=5, noise=0.3, seed=5)
+    clusters = clusters_of(articles, [5])
+    assert_matches_reference(clusters)
+    stats = ArticleClusterer().cluster_stats(clusters)[0]
+    assert stats['nearest_cluster_id'] is None
+    assert stats['nearest_cluster_similarity'] is None
+
+def test_cluster_stats_skips_empty_clusters():
+    clusters = clusters_of(topic_articles(n_topics=2, per_topic=3), [3, 3])
+    clusters.insert(1, {'cluster_id': 99, 'articles': [], 'size': 0})
+    assert [s['cluster_id'] for s in ArticleClusterer().cluster_stats(clusters)] == [10, 11]
@@ -0,0 +1,44 @@
+import numpy as np
+
+from ai_pipeline.article_clusterer import IncrementalClusterer
+from cluster_store import ClusterStore
+
+def articles(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = np.linalg.qr(rng.normal(size=(dim, 3)))[0].T
+    return [
+        {'url': f"https://news.example.com/{i}", 'embedding': topics[i % 3] + 0.05 * rng.normal(size=dim)}
+        for i in range(n)
+    ]
+
+def test_reloaded_store_restores_clusters(session_factory):
+    batch = articles(30)
+    clusterer = IncrementalClusterer(similarity_threshold=0.8, max_cluster_size=6, store=ClusterStore(session_factory))
+    clusterer.add_articles(batch[:20])
+    clusterer.add_articles(batch[20:])
+    assert len(clusterer) > 3  # topics of 10 were split
+    urls = [article['url'] for article in batch]
+    members = clusterer.store.existing_members(urls)
+    # The second batch is as assigned; first-batch articles may since have moved in a split
+    assert {url: members[url] for url in urls[20:]} == {a['url']: a['cluster_id'] for a in batch[20:]}
+
+    reloaded = IncrementalClusterer(similarity_threshold=0.8, max_cluster_size=6, store=ClusterStore(session_factory))
+    assert reloaded.cluster_ids == clusterer.cluster_ids
+    assert reloaded.counts.tolist() == clusterer.counts.tolist()
+    assert np.allclose(reloaded.centroids()[1], clusterer.centroids()[1], atol=1e-6)
+    assert reloaded.next_id == clusterer.next_id
+
+    assert reloaded.store.existing_members(urls) == members
+    for cluster_id in reloaded.cluster_ids:
+        keys, vectors = reloaded.store.cluster_members(cluster_id)
+        assert len(keys) == len(vectors) == reloaded.counts[reloaded._row[cluster_id]]
+
+def test_reloaded_clusterer_keeps_known_articles(session_factory):
+    batch = articles(6)
+    IncrementalClusterer(store=ClusterStore(session_factory)).add_articles(batch)
+
+    again = [dict(article) for article in batch]
+    reloaded = IncrementalClusterer(store=ClusterStore(session_factory))
+    reloaded.add_articles(again)
+    assert [a['cluster_id'] for a in again] == [a['cluster_id'] for a in batch]
+    assert sum(reloaded.counts) == 6
@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+pytest.importorskip("newspaper")
+
+from ai_pipeline import content_scraper
+from ai_pipeline.content_scraper import DomainRateLimiter, iter_scraped
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = DomainRateLimiter(rate=20)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire('a.example.com')
+    limiter.acquire('b.example.com')  # other hosts have their own bucket
+    assert 0.09 <= time.monotonic() - start < 0.5
+
+def test_yields_every_article(monkeypatch):
+    monkeypatch.setattr(content_scraper, 'scrape_article_content', lambda url, timeout=10: f"text of {url}")
+    articles = [{'url': f"https://site{i % 3}.example.com/{i}"} for i in range(9)]
+    results = list(iter_scraped(articles, max_workers=4, per_domain_rate=1000))
+    assert sorted(text for _, text in results) == sorted(f"text of {a['url']}" for a in articles)
+
+def test_stopping_early_does_not_wait_for_queued_downloads(monkeypatch):
+    def slow_scrape(url, timeout=10):
+        time.sleep(0.2)
+        return "text"
+    monkeypatch.setattr(content_scraper, 'scrape_article_content', slow_scrape)
+    articles = [{'url': f"https://site{i}.example.com/"} for i in range(40)]
+
+    start = time.monotonic()
+    scraped = iter_scraped(articles, max_workers=2, per_domain_rate=1000)
+    next(scraped)
+    scraped.close()
+    # Finishing the queue would take 40 * 0.2 / 2 = 4s
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import database
+from models import User
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    database.init_db()
+
+def session_from(dependency):
+    sessions = dependency()
+    return next(sessions), sessions
+
+def test_read_session_is_query_only():
+    assert database.read_engine is not database.engine
+    db, sessions = session_from(database.get_read_db)
+    try:
+        db.add(User(email="reader@example.com"))
+        with pytest.raises(OperationalError, match="readonly"):
+            db.commit()
+    finally:
+        db.rollback()
+        sessions.close()
+
+def test_read_session_sees_committed_writes():
+    db, sessions = session_from(database.get_db)
+    try:
+        db.add(User(email="writer@example.com", name="Writer"))
+        db.commit()
+    finally:
+        sessions.close()
+
+    db, sessions = session_from(database.get_read_db)
+    try:
+        assert db.query(User).filter(User.email == "writer@example.com").one().name == "Writer"
+    finally:
+        sessions.close()
+
+def test_pool_stats_reports_both_engines():
+    stats = database.pool_stats()
+    assert stats["write"]["type"] and stats["read"]["type"]
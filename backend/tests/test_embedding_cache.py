@@ -0,0 +1,42 @@
+import numpy as np
+
+from db_utils import LOOKUP_CHUNK_SIZE, chunked
+from embedding_cache import EmbeddingCache, content_hash
+from models import EmbeddingCache as EmbeddingCacheRow
+
+def test_keys_depend_on_model_and_text():
+    cache = EmbeddingCache('mini')
+    assert cache.key("text") == content_hash('mini', "text")
+    assert cache.key("text") != EmbeddingCache('mini@onnx').key("text")
+    assert cache.key("text") != cache.key("text ")
+
+def test_put_then_get_round_trips_vectors(session_factory):
+    cache = EmbeddingCache('mini', session_factory=session_factory)
+    vectors = {cache.key(f"text {i}"): np.full(4, i, dtype=np.float32) for i in range(3)}
+    cache.put_many(vectors)
+
+    found = cache.get_many([cache.key("text 1"), cache.key("missing"), cache.key("text 1")])
+    assert list(found) == [cache.key("text 1")]
+    assert np.array_equal(found[cache.key("text 1")], vectors[cache.key("text 1")])
+
+def test_existing_keys_are_not_written_twice(session_factory):
+    cache = EmbeddingCache('mini', session_factory=session_factory)
+    key = cache.key("text")
+    cache.put_many({key: np.ones(4)})
+    cache.put_many({key: np.zeros(4), cache.key("other"): np.zeros(4)})
+
+    db = session_factory()
+    assert db.query(EmbeddingCacheRow).count() == 2
+    db.close()
+    assert cache.get_many([key])[key][0] == 1.0
+
+def test_lookups_span_several_in_chunks(session_factory):
+    cache = EmbeddingCache('mini', session_factory=session_factory)
+    vectors = {cache.key(f"text {i}"): np.full(2, i, dtype=np.float32) for i in range(2 * LOOKUP_CHUNK_SIZE + 10)}
+    cache.put_many(vectors)
+    assert len(cache.get_many(list(vectors))) == len(vectors)
+
+def test_chunked_covers_every_value_once():
+    chunks = list(chunked(range(1201), size=500))
+    assert [len(chunk) for chunk in chunks] == [500, 500, 201]
+    assert sum(chunks, []) == list(range(1201))
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+import embedding_store
+from embedding_store import MemmapEmbeddingStore
+from ingestion import backfill_tag_matches
+from models import Article, ArticleTag
+from semantic_matcher import SemanticMatcher
+
+DIM = 16
+
+def vector_for(item_id):
+    return np.random.default_rng(item_id).normal(size=DIM).astype(np.float32)
+
+def vectors_for(ids):
+    return np.vstack([vector_for(i) for i in ids])
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("dtype, tolerance", [("int8", 0.02), ("float16", 0.002)])
+def test_round_trip_is_close_to_normalized_input(tmp_path, dtype, tolerance):
+    store = MemmapEmbeddingStore(str(tmp_path / "store"), dtype=dtype)
+    ids = list(range(1, 101))
+    assert store.append(ids, vectors_for(ids)) == 100
+    assert np.abs(store.get(ids) - unit(vectors_for(ids))).max() < tolerance
+
+def test_skips_stored_and_repeated_ids(tmp_path):
+    store = MemmapEmbeddingStore(str(tmp_path / "store"))
+    store.append([1, 2], vectors_for([1, 2]))
+    assert store.append([2, 3, 3], vectors_for([2, 3, 3])) == 1
+    assert len(store) == 3
+    assert store.missing([4, 1, 5, 3]) == [4, 5]
+
+def test_other_instances_see_appends(tmp_path):
+    path = str(tmp_path / "store")
+    writer = MemmapEmbeddingStore(path)
+    reader = MemmapEmbeddingStore(path)
+    writer.append([1, 2, 3], vectors_for([1, 2, 3]))
+    assert len(reader) == 3 and 2 in reader
+    ids, vectors = next(reader.iter_chunks())
+    assert ids.tolist() == [1, 2, 3]
+
+def test_append_after_a_torn_write_stays_aligned(tmp_path):
+    path = str(tmp_path / "store")
+    store = MemmapEmbeddingStore(path)
+    store.append([1, 2], vectors_for([1, 2]))
+    # A writer died after writing vector data but before its ids
+    with open(os.path.join(path, "vectors.int8"), "ab") as f:
+        f.write(b"\x7f" * DIM * 3)
+    store.append([3], vectors_for([3]))
+    assert np.abs(MemmapEmbeddingStore(path).get([1, 2, 3]) - unit(vectors_for([1, 2, 3]))).max() < 0.02
+
+def test_search_rescores_quantized_candidates_at_float32(tmp_path):
+    store = MemmapEmbeddingStore(str(tmp_path / "store"))
+    ids = list(range(1, 501))
+    store.append(ids, vectors_for(ids))
+    query = vector_for(10_000)
+    exact = unit(vectors_for(ids)) @ (query / np.linalg.norm(query))
+
+    results = store.search(query, ids, k=10)
+    expected = [ids[i] for i in np.argsort(-exact)[:10]]
+    assert [item_id for item_id, _ in results] == expected
+    # Final scores come from the float32 sidecar, not the int8 rows
+    assert np.allclose([score for _, score in results], np.sort(exact)[::-1][:10], atol=1e-5)
+    # Ids that are not stored are ignored
+    assert {item_id for item_id, _ in store.search(query, [1, 2, 999], k=5)} == {1, 2}
+
+def test_search_without_float32_uses_quantized_scores(tmp_path):
+    path = str(tmp_path / "store")
+    store = MemmapEmbeddingStore(path, keep_float32=False)
+    ids = list(range(1, 101))
+    store.append(ids, vectors_for(ids))
+    assert not os.path.exists(os.path.join(path, "full.f32"))
+
+    query = vector_for(10_000)
+    exact = unit(vectors_for(ids)) @ (query / np.linalg.norm(query))
+    item_id, score = store.search(query, ids, k=1)[0]
+    assert abs(score - exact[item_id - 1]) < 0.02
+    # Reopening keeps the layout the store was created with
+    assert not MemmapEmbeddingStore(path).keep_float32
+
+def _append_range(path, first_id, batches, batch_size):
+    store = MemmapEmbeddingStore(path)
+    for batch in range(batches):
+        start = first_id + batch * batch_size
+        ids = list(range(start, start + batch_size))
+        store.append(ids, vectors_for(ids))
+
+@pytest.mark.skipif(embedding_store.fcntl is None, reason="cross-process lock needs fcntl")
+def test_concurrent_writer_processes(tmp_path):
+    path = str(tmp_path / "store")
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_append_range, args=(path, 1 + w * 10000, 40, 25))
+        for w in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    store = MemmapEmbeddingStore(path)
+    ids = np.concatenate([chunk_ids for chunk_ids, _ in store.iter_chunks()]).tolist()
+    assert len(ids) == len(set(ids)) == 4 * 40 * 25
+    assert np.abs(store.get(ids) - unit(vectors_for(ids))).max() < 0.02
+
+@pytest.fixture
+def db(db):
+    for article_id in range(1, 11):
+        db.add(Article(
+            id=article_id, title=f"Article {article_id}", url=f"https://example.com/{article_id}",
+            embedding=vector_for(article_id).tobytes()
+        ))
+    db.commit()
+    return db
+
+def test_articles_below_the_store_max_id_are_indexed_and_backfilled(tmp_path, db):
+    path = str(tmp_path / "store")
+    # Ids 6-8 committed late (or were ingested by a process without the store)
+    stored = [1, 2, 3, 4, 5, 9]
+    MemmapEmbeddingStore(path).append(stored, vectors_for(stored))
+
+    matcher = SemanticMatcher(use_cache=False, article_store_path=path)
+    assert matcher.load_article_index(db) == 10
+    assert len(matcher.article_store) == 10
+    # Searches go through the store, including for ids it only got from the database
+    assert matcher.search_articles(vector_for(7), k=1)[0]['article_id'] == 7
+
+    created = backfill_tag_matches(db, matcher, 1, np.ones(DIM, dtype=np.float32), threshold=-1.0, chunk_size=4)
+    assert created == 10
+    assert db.query(ArticleTag).count() == 10
+
+def test_backfill_reads_articles_missing_from_the_store(tmp_path, db):
+    path = str(tmp_path / "store")
+    stored = [1, 2, 3, 4, 5, 9]
+    MemmapEmbeddingStore(path).append(stored, vectors_for(stored))
+    matcher = SemanticMatcher(use_cache=False, article_store_path=path)
+    matcher.index_loaded = True  # as after startup, before ids 6-8 reached the store
+
+    created = backfill_tag_matches(db, matcher, 1, np.ones(DIM, dtype=np.float32), threshold=-1.0, chunk_size=4)
+    assert created == 10
@@ -0,0 +1,46 @@
+import threading
+
+import numpy as np
+
+from embedding_worker import EmbeddingBatcher
+
+def fake_encode(texts):
+    return np.vstack([np.full(4, len(text), dtype=np.float32) for text in texts])
+
+def test_results_match_their_texts():
+    batcher = EmbeddingBatcher(fake_encode)
+    embeddings = batcher.encode_many(["a", "bbb", "cc"])
+    assert embeddings[:, 0].tolist() == [1, 3, 2]
+
+def test_concurrent_requests_are_coalesced():
+    batcher = EmbeddingBatcher(fake_encode, max_batch_size=64, max_wait_ms=50)
+    results = {}
+
+    def request(i):
+        results[i] = batcher.encode_many(["x" * i])
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(1, 33)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(results[i][0, 0] == i for i in results)
+    stats = batcher.stats()
+    assert stats["texts"] == 32 and stats["batches"] < 32
+
+def test_empty_input_returns_empty_matrix():
+    batcher = EmbeddingBatcher(fake_encode)
+    assert batcher.encode_many([]).shape == (0, 4)
+    batcher.encode_many(["abc"])
+    assert batcher.encode_many([]).shape == (0, 4)
+
+def test_encode_errors_reach_the_caller():
+    def failing(texts):
+        raise RuntimeError("model failed")
+    batcher = EmbeddingBatcher(failing)
+    try:
+        batcher.encode_many(["a"])
+    except RuntimeError as e:
+        assert str(e) == "model failed"
+    else:
+        raise AssertionError("expected the encode error")
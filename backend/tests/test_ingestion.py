@@ -0,0 +1,73 @@
+import threading
+
+from ingestion import link_articles, upsert_articles
+from models import Article, ArticleTag
+
+def make_articles(n, start=0):
+    return [{'title': f"Article {i}", 'url': f"https://example.com/{i}"} for i in range(start, start + n)]
+
+def test_upsert_articles_resolves_existing_urls(db):
+    first, new_count = upsert_articles(db, make_articles(3))
+    assert new_count == 3
+    second, new_count = upsert_articles(db, make_articles(4) + make_articles(1))
+    assert new_count == 1
+    assert [a.id for a in second[:3]] == [a.id for a in first]
+    assert len(second) == 4
+
+def test_concurrent_ingestions_of_the_same_urls_do_not_conflict(session_factory):
+    errors, new_counts = [], []
+    for round_number in range(5):
+        articles = make_articles(50, start=round_number * 50)
+        barrier = threading.Barrier(2)
+
+        def ingest():
+            db = session_factory()
+            try:
+                barrier.wait()
+                stored, new_count = upsert_articles(db, articles)
+                db.commit()
+                new_counts.append(new_count)
+                assert [a.url for a in stored] == [a['url'] for a in articles]
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        workers = [threading.Thread(target=ingest) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    assert errors == []
+    assert sum(new_counts) == 250  # each URL was inserted by exactly one of the two
+    db = session_factory()
+    assert db.query(Article).count() == 250
+    db.close()
+
+def test_generic_fallback_upserts_articles(db, monkeypatch):
+    first, _ = upsert_articles(db, make_articles(2))
+    monkeypatch.setattr(db.get_bind().dialect, 'name', 'mysql')
+    second, new_count = upsert_articles(db, make_articles(3))
+    assert new_count == 1
+    assert [a.id for a in second[:2]] == [a.id for a in first]
+
+def links_for(articles, tag_id, score=0.5):
+    return [{'article_id': a.id, 'tag_id': tag_id, 'relevance_score': score} for a in articles]
+
+def test_link_articles_skips_existing_pairs(db):
+    articles, _ = upsert_articles(db, make_articles(3))
+    assert link_articles(db, links_for(articles[:2], 1)) == 2
+    # One new pair, one existing pair, and a duplicate within the batch
+    assert link_articles(db, links_for(articles[1:], 1) + links_for(articles[2:], 1, score=0.9)) == 1
+    assert db.query(ArticleTag).count() == 3
+    assert db.query(ArticleTag).filter(ArticleTag.article_id == articles[2].id).one().relevance_score == 0.9
+
+def test_generic_fallback_skips_existing_pairs(db, monkeypatch):
+    articles, _ = upsert_articles(db, make_articles(3))
+    link_articles(db, links_for(articles[:2], 1))
+    # Databases other than SQLite/PostgreSQL take the query-then-insert path
+    monkeypatch.setattr(db.get_bind().dialect, 'name', 'mysql')
+    assert link_articles(db, links_for(articles, 1) + links_for(articles, 2)) == 4
+    assert link_articles(db, links_for(articles, 2)) == 0
+    assert db.query(ArticleTag).count() == 6
@@ -0,0 +1,113 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from ingestion import link_articles
+from migrations import upgrade_schema
+from models import Article, ArticleTag, Base, Tag
+from semantic_matcher import SemanticMatcher
+
+# Schema as created by the first release, before any column was added
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, email VARCHAR NOT NULL, name VARCHAR, created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (email)
+);
+CREATE TABLE articles (
+    id INTEGER NOT NULL, title VARCHAR NOT NULL, description TEXT, content TEXT,
+    url VARCHAR NOT NULL, source VARCHAR, author VARCHAR, image_url VARCHAR,
+    published_at DATETIME, fetched_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (url)
+);
+CREATE TABLE tags (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, tag_name VARCHAR NOT NULL, category VARCHAR,
+    keywords JSON, priority INTEGER, created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE article_tags (
+    id INTEGER NOT NULL, article_id INTEGER NOT NULL, tag_id INTEGER NOT NULL,
+    relevance_score FLOAT, matched_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(article_id) REFERENCES articles (id), FOREIGN KEY(tag_id) REFERENCES tags (id)
+);
+INSERT INTO users (id, email, name, created_at) VALUES (1, 'a@example.com', 'A', '2025-01-01 00:00:00');
+INSERT INTO tags (id, user_id, tag_name, keywords, priority, created_at)
+    VALUES (1, 1, 'AI', '["llm"]', 1, '2025-01-01 00:00:00');
+INSERT INTO articles (id, title, url) VALUES (1, 'First', 'https://example.com/1');
+INSERT INTO articles (id, title, url) VALUES (2, 'Second', 'https://example.com/2');
+"""
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    path = tmp_path / "baseline.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.close()
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+def upgrade(engine):
+    # What init_db does on startup
+    Base.metadata.create_all(bind=engine)
+    return upgrade_schema(engine)
+
+def test_adds_tag_embedding_columns(baseline_engine):
+    changes = upgrade(baseline_engine)
+    assert "added column tags.embedding" in changes
+    assert "added column tags.embedding_hash" in changes
+
+    session = sessionmaker(bind=baseline_engine)()
+    tag = session.query(Tag).filter(Tag.user_id == 1).one()
+    assert tag.tag_name == 'AI' and tag.keywords == ['llm']
+    assert tag.embedding is None and tag.embedding_hash is None
+    session.close()
+
+def test_adds_article_embedding_column(baseline_engine):
+    assert "added column articles.embedding" in upgrade(baseline_engine)
+
+    session = sessionmaker(bind=baseline_engine)()
+    assert [a.embedding for a in session.query(Article).order_by(Article.id)] == [None, None]
+    session.query(Article).filter(Article.id == 2).one().embedding = np.ones(4, dtype=np.float32).tobytes()
+    session.commit()
+
+    # Loading the index on startup reads the new column
+    matcher = SemanticMatcher(use_cache=False)
+    assert matcher.load_article_index(session) == 1
+    assert matcher.search_articles(np.ones(4, dtype=np.float32), k=1)[0]['article_id'] == 2
+    session.close()
+
+def test_adds_feed_index(baseline_engine):
+    assert "added index ix_article_tags_tag_score" in upgrade(baseline_engine)
+    indexes = {index['name']: index['column_names'] for index in inspect(baseline_engine).get_indexes('article_tags')}
+    assert indexes['ix_article_tags_tag_score'] == ['tag_id', 'relevance_score']
+
+def test_upgrade_is_idempotent(baseline_engine):
+    upgrade(baseline_engine)
+    assert upgrade(baseline_engine) == []
+
+def test_fresh_database_needs_no_upgrade(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert upgrade(engine) == []
+    assert 'embedding' in {column['name'] for column in inspect(engine).get_columns('tags')}
+
+def test_deduplicates_article_links_before_adding_unique_index(baseline_engine):
+    with baseline_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO article_tags (id, article_id, tag_id, relevance_score) VALUES "
+            "(1, 1, 1, 0.4), (2, 1, 1, 0.7), (3, 1, 1, 0.7), (4, 2, 1, 0.5)"
+        )
+    changes = upgrade(baseline_engine)
+    assert "removed 2 duplicate article_tags rows" in changes
+    assert "added unique index article_tags(article_id, tag_id)" in changes
+
+    session = sessionmaker(bind=baseline_engine)()
+    # The best-scoring (then oldest) link of each pair survives
+    assert sorted(row.id for row in session.query(ArticleTag)) == [2, 4]
+    # ON CONFLICT needs the unique index
+    links = [{'article_id': a, 'tag_id': 1, 'relevance_score': 0.9} for a in (1, 2)]
+    assert link_articles(session, links) == 0
+    session.close()
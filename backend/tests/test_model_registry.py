@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import os
+
+from ai_pipeline.model_registry import ModelRegistry
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_api_imports_do_not_need_newsapi():
+    # semantic_matcher only needs the registry; ai_pipeline's fetcher (and newsapi) load lazily
+    code = "import sys, semantic_matcher; assert 'newsapi' not in sys.modules, 'newsapi imported'"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_status_does_not_load_models():
+    registry = ModelRegistry()
+    assert registry.status() == {}
+    assert not registry.is_ready(ModelRegistry.sentence_transformer_key('all-MiniLM-L6-v2', 'torch'))
+
+def test_keys_separate_backends_and_onnx_files():
+    keys = {
+        ModelRegistry.sentence_transformer_key('m', 'torch'),
+        ModelRegistry.sentence_transformer_key('m', 'int8'),
+        ModelRegistry.sentence_transformer_key('m', 'onnx'),
+        ModelRegistry.sentence_transformer_key('m', 'onnx', 'onnx/model_qint8_avx512_vnni.onnx'),
+        ModelRegistry.sentence_transformer_key('m', 'onnx', 'onnx/model_O4.onnx'),
+    }
+    assert len(keys) == 5
+    # torch keeps the original key, so existing caches stay valid
+    assert ModelRegistry.sentence_transformer_key('m') == 'sentence-transformers/m'
@@ -0,0 +1,84 @@
+import sqlite3
+import time
+
+import numpy as np
+
+from ai_pipeline.near_duplicates import NearDuplicateIndex, _optimal_bands
+
+ARTICLE = (
+    "OpenAI released a new reasoning model on Tuesday that it says outperforms earlier "
+    "systems on maths and coding benchmarks, and will be available to paying customers first."
+)
+
+def similar_signature(signature, jaccard, rng):
+    """A MinHash signature whose slots agree with signature with probability jaccard"""
+    other = rng.integers(0, 1 << 32, len(signature), dtype=np.uint64).astype(np.uint32)
+    same = rng.random(len(signature)) < jaccard
+    other[same] = signature[same]
+    return other
+
+def recall(index, jaccard, trials=400, seed=0):
+    rng = np.random.default_rng(seed)
+    found = 0
+    for trial in range(trials):
+        base = rng.integers(0, 1 << 32, index.num_perm, dtype=np.uint64).astype(np.uint32)
+        index._insert(f"a{trial}", base, persist=False)
+        found += any(key == f"a{trial}" for key, _ in index._query(similar_signature(base, jaccard, rng)))
+    return found / trials
+
+def test_bands_favour_recall_around_the_threshold():
+    bands, rows = _optimal_bands(0.6, 128)
+    assert bands * rows <= 128
+    candidate = lambda s: 1 - (1 - s ** rows) ** bands
+    assert candidate(0.6) > 0.8
+    assert candidate(0.3) < 0.1
+
+def test_recall_above_threshold():
+    index = NearDuplicateIndex(threshold=0.6)
+    assert recall(index, 0.7) >= 0.95
+    assert recall(index, 0.3) == 0
+
+def test_lightly_edited_copy_is_a_near_duplicate():
+    index = NearDuplicateIndex()
+    assert index.check_and_add("original", ARTICLE) is None
+    edited = ARTICLE.replace("Tuesday", "Wednesday").replace("first", "initially")
+    assert index.check_and_add("copy", edited) == "original"
+    assert index.check_and_add("other", "Nvidia reported record data centre revenue") is None
+
+def test_signatures_persist_and_old_ones_are_pruned(tmp_path):
+    path = str(tmp_path / "minhash.db")
+    index = NearDuplicateIndex(path=path)
+    index.add("original", ARTICLE)
+    index.flush()
+    assert NearDuplicateIndex(path=path).query(ARTICLE)[0][0] == "original"
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE minhash_signatures SET created_at = ?", (time.time() - 31 * 86400,))
+    assert len(NearDuplicateIndex(path=path, max_age_days=30)) == 0
+
+def test_stored_signatures_are_capped(tmp_path):
+    path = str(tmp_path / "minhash.db")
+    index = NearDuplicateIndex(path=path, max_entries=3)
+    for i in range(5):
+        index.add(f"a{i}", f"{ARTICLE} {i}")
+        index.flush()
+    assert len(NearDuplicateIndex(path=path, max_entries=3)) == 3
+
+def test_files_without_created_at_are_upgraded(tmp_path):
+    path = str(tmp_path / "minhash.db")
+    index = NearDuplicateIndex()
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE minhash_signatures (key TEXT NOT NULL, params TEXT NOT NULL, "
+            "signature BLOB NOT NULL, PRIMARY KEY (key, params))"
+        )
+        conn.execute(
+            "INSERT INTO minhash_signatures VALUES (?, ?, ?)",
+            ("original", index._params, index.signature(ARTICLE).tobytes())
+        )
+    # Existing rows are kept (their age starts now) and new ones are stamped
+    upgraded = NearDuplicateIndex(path=path)
+    assert upgraded.query(ARTICLE)[0][0] == "original"
+    upgraded.add("other", "Nvidia reported record data centre revenue")
+    upgraded.flush()
+    assert len(NearDuplicateIndex(path=path)) == 2
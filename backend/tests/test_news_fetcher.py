@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import news_fetcher
+from config import Config
+from news_fetcher import NewsFetcher
+
+@pytest.fixture
+def newsapi(monkeypatch):
+    """
+    Route NewsFetcher's async client to a handler: handler(params) -> httpx.Response,
+    answered after routes['delay'] seconds (default 0)
+    """
+    monkeypatch.setattr(Config, 'NEWS_CACHE_TTL_SECONDS', 0)
+    monkeypatch.setattr(news_fetcher, '_request_budget', None)
+    routes = {}
+    real_client = httpx.AsyncClient
+
+    async def dispatch(request):
+        await asyncio.sleep(routes.get('delay', 0))
+        return routes['handler'](dict(request.url.params))
+
+    monkeypatch.setattr(news_fetcher.httpx, 'AsyncClient',
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(dispatch), **kwargs))
+    return routes
+
+def articles(prefix, n, start=0):
+    return [{'title': f"{prefix} {i}", 'url': f"https://example.com/{prefix}/{i}"} for i in range(start, start + n)]
+
+def test_fetch_many_reports_failed_keywords(newsapi):
+    def handler(params):
+        if params['q'] == 'broken':
+            return httpx.Response(500, json={'status': 'error', 'message': 'server error'})
+        if params['q'] == 'limited':
+            return httpx.Response(200, json={'status': 'error', 'message': 'rate limited'})
+        return httpx.Response(200, json={'status': 'ok', 'totalResults': 2, 'articles': articles(params['q'], 2)})
+    newsapi['handler'] = handler
+
+    errors = {}
+    results = NewsFetcher().fetch_many(['ai', 'broken', 'limited'], errors=errors)
+    assert len(results['ai']) == 2
+    assert results['broken'] == [] and results['limited'] == []
+    assert set(errors) == {'broken', 'limited'}
+    assert errors['limited'] == 'rate limited'
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    monkeypatch.setattr(Config, 'NEWS_CACHE_TTL_SECONDS', 60)
+    monkeypatch.setattr(Config, 'NEWS_CACHE_PATH', None)
+    monkeypatch.setattr(news_fetcher, '_response_cache', None)
+
+def paged_handler(total, requests):
+    def handler(params):
+        requests.append(int(params.get('page', 1)))
+        page_size = int(params['pageSize'])
+        start = (requests[-1] - 1) * page_size
+        page = articles('ai', max(0, min(page_size, total - start)), start)
+        return httpx.Response(200, json={'status': 'ok', 'totalResults': total, 'articles': page})
+    return handler
+
+def deep_fetch(fetcher):
+    return [article for page in fetcher.iter_pages('ai', pages=5, page_size=100) for article in page]
+
+def test_cached_first_page_keeps_total_results(newsapi, response_cache):
+    requests = []
+    newsapi['handler'] = paged_handler(150, requests)
+    fetcher = NewsFetcher()
+
+    assert len(deep_fetch(fetcher)) == 150
+    assert requests == [1, 2]
+    # All from cache: page 1 still says there are only two pages, so nothing is requested
+    assert len(deep_fetch(fetcher)) == 150
+    assert requests == [1, 2]
+    assert news_fetcher.get_request_budget().remaining() in (None, Config.NEWS_API_REQUEST_BUDGET - 2)
+
+def test_cached_short_first_page_ends_the_fetch(newsapi, response_cache):
+    requests = []
+    newsapi['handler'] = paged_handler(30, requests)
+    fetcher = NewsFetcher()
+    deep_fetch(fetcher)
+    deep_fetch(fetcher)
+    assert requests == [1]
+
+def test_stopping_iter_pages_stops_the_fetch(newsapi):
+    requests = []
+    newsapi['handler'] = paged_handler(200, requests)
+    newsapi['delay'] = 0.05
+    pages = NewsFetcher().iter_pages('ai', pages=20, page_size=10, max_concurrency=1, max_buffered_pages=1)
+    assert len(next(pages)) == 10
+    pages.close()
+
+    time.sleep(0.2)
+    fetched = len(requests)
+    assert fetched <= 3
+    time.sleep(0.3)
+    assert len(requests) == fetched
+    assert not any(thread.name == "newsapi-deep-fetch" for thread in threading.enumerate())
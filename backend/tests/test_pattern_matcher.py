@@ -0,0 +1,55 @@
+import random
+
+from ai_pipeline.pattern_matcher import PatternMatcher
+
+def naive_occurrences(text, phrase, whole_words=False):
+    """Every (overlapping) start index of phrase in text, by plain substring search"""
+    starts, start = [], text.find(phrase)
+    while start != -1:
+        end = start + len(phrase)
+        if not whole_words or (
+            (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+        ):
+            starts.append(start)
+        start = text.find(phrase, start + 1)
+    return starts
+
+def naive_counts(patterns, text, distinct=True, whole_words=False):
+    counts = {}
+    for category, phrases in patterns.items():
+        counts[category] = 0
+        for phrase in dict.fromkeys(phrases):
+            found = len(naive_occurrences(text, phrase, whole_words))
+            counts[category] += min(found, 1) if distinct else found
+    return counts
+
+def random_patterns(rng):
+    # A tiny alphabet forces overlapping phrases and phrases inside other phrases
+    word = lambda: "".join(rng.choice("ab") for _ in range(rng.randint(1, 4)))
+    return {
+        'spam': [word() for _ in range(rng.randint(1, 6))],
+        'blocklist': [word() + rng.choice(["", " " + word()]) for _ in range(rng.randint(1, 4))]
+    }
+
+def test_counts_match_naive_substring_search():
+    rng = random.Random(0)
+    for _ in range(300):
+        patterns = random_patterns(rng)
+        text = "".join(rng.choice("ab ") for _ in range(rng.randint(0, 60))).strip()
+        text = " ".join(text.split())
+        for whole_words in (False, True):
+            matcher = PatternMatcher(patterns, whole_words=whole_words)
+            for distinct in (True, False):
+                assert matcher.counts(text, distinct) == naive_counts(patterns, text, distinct, whole_words)
+            assert matcher.matches_any(text) == any(naive_counts(patterns, text, whole_words=whole_words).values())
+
+def test_find_reports_matches_in_text_order():
+    matcher = PatternMatcher({'spam': ['click here', 'here'], 'blocklist': ['casino']})
+    assert list(matcher.find("Click  HERE for the Casino")) == [
+        ('spam', 'click here'), ('spam', 'here'), ('blocklist', 'casino')
+    ]
+
+def test_whole_words_skips_matches_inside_words():
+    matcher = PatternMatcher({'keyword': ['ai']}, whole_words=True)
+    assert matcher.matches_any("Regulators look at AI models")
+    assert not matcher.matches_any("Said the chairman")
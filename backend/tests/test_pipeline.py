@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("newsapi")
+pytest.importorskip("newspaper")
+
+from ai_pipeline.data_fetcher import ArticleFetcher
+from ai_pipeline.pipeline import Stage, StreamingPipeline, build_topic_pipeline
+
+class PassThroughAnalyzer:
+    def analyze_batch(self, batch, batch_size=64):
+        return batch
+
+def raw_article(i, url=None):
+    return {
+        'title': f"Semiconductor supply update number {i}",
+        'description': f"Report {i}: chip makers outline capacity plans, pricing and delivery timelines for the coming year.",
+        'url': url or f"https://news.example.com/{i}",
+        'source': {'name': 'Example News'}
+    }
+
+def test_repeated_url_in_a_later_batch_is_dropped():
+    fetcher = ArticleFetcher("test-key", near_duplicate_threshold=None)
+    pipeline = build_topic_pipeline(fetcher, PassThroughAnalyzer())
+    # The copy of article 3 arrives well after the first preprocess batch of 100
+    source = [raw_article(i) for i in range(150)]
+    source.append(raw_article(999, url="https://news.example.com/3"))
+    source.append(raw_article(7))
+
+    urls = [article['url'] for article in pipeline.run(iter(source))]
+    assert len(urls) == 150
+    assert len(set(urls)) == 150
+
+def test_preprocess_without_shared_sets_dedupes_per_call():
+    fetcher = ArticleFetcher("test-key", near_duplicate_threshold=None)
+    assert len(fetcher.preprocess_articles([raw_article(1), raw_article(1)])) == 1
+    assert len(fetcher.preprocess_articles([raw_article(1)])) == 1
+
+def test_streaming_pipeline_keeps_order_with_one_worker():
+    pipeline = StreamingPipeline([Stage('double', lambda batch: [x * 2 for x in batch], batch_size=4)])
+    assert list(pipeline.run(range(10))) == [x * 2 for x in range(10)]
+
+def test_keyword_stage_drops_articles_before_analysis():
+    fetcher = ArticleFetcher("test-key", near_duplicate_threshold=None)
+    analyzed = []
+
+    class RecordingAnalyzer:
+        def analyze_batch(self, batch, batch_size=64):
+            analyzed.extend(article['url'] for article in batch)
+            return batch
+
+    source = [raw_article(i) for i in range(4)]
+    source[1]['title'] = "Rocket launch update for the weekend crowd"
+    source[1]['description'] = "A rocket launch is scheduled this weekend, with crowds expected along the coast to watch it."
+    pipeline = build_topic_pipeline(fetcher, RecordingAnalyzer(), keywords=["Rocket Launch"])
+    urls = [article['url'] for article in pipeline.run(iter(source))]
+    assert urls == analyzed == ["https://news.example.com/1"]
+    assert [stage['stage'] for stage in pipeline.stats()][:3] == ['preprocess', 'filter', 'keywords']
+
+def test_filter_by_keywords_matches_whole_words():
+    fetcher = ArticleFetcher("test-key", near_duplicate_threshold=None)
+    articles = [{'full_text': "Said the chairman"}, {'full_text': "New AI chips"}]
+    assert fetcher.filter_by_keywords(articles, ["ai"]) == [articles[1]]
+
+def test_spam_patterns_can_come_from_a_json_file(tmp_path):
+    path = tmp_path / "spam.json"
+    path.write_text('{"spam": ["miracle cure", "act fast"]}')
+    fetcher = ArticleFetcher("test-key", near_duplicate_threshold=None, spam_patterns=str(path), spam_limits={'spam': 1})
+    assert fetcher._is_spam({'full_text': "A miracle cure for slow laptops"})
+    assert not fetcher._is_spam({'full_text': "Click here to buy now"})
+
+def story(i, title, description):
+    return dict(raw_article(i), title=title, description=description)
+
+CHIPS = story(1, "Chip makers outline new capacity plans",
+              "Semiconductor firms detailed fab expansions, pricing and delivery timelines for the coming year.")
+ROCKETS = story(2, "Rocket launch set for the weekend",
+                "A crewed rocket launch is scheduled for Saturday, with crowds expected along the coast to watch it.")
+
+def reworded(article):
+    copy = dict(article, url=article['url'] + "-copy")
+    copy['description'] = copy['description'].replace("expected", "likely").replace("the coming year", "next year")
+    return copy
+
+def test_only_kept_articles_suppress_near_duplicates(tmp_path):
+    path = str(tmp_path / "near_duplicates.db")
+    fetcher = ArticleFetcher("test-key", near_duplicate_path=path, spam_limits={'spam': 1})
+    spam = dict(CHIPS, description=CHIPS['description'] + " Click here")
+    kept = fetcher.filter_by_quality(fetcher.preprocess_articles([spam, ROCKETS]))
+    assert [a['url'] for a in kept] == [ROCKETS['url']]
+
+    # A later run (same file): the copy of the kept article is dropped, the
+    # clean copy of the rejected one is not
+    fetcher = ArticleFetcher("test-key", near_duplicate_path=path, spam_limits={'spam': 1})
+    clean_copy = dict(CHIPS, url="https://other.example.com/1")
+    kept = fetcher.filter_by_quality(fetcher.preprocess_articles([reworded(ROCKETS), clean_copy]))
+    assert [a['url'] for a in kept] == [clean_copy['url']]
+
+def test_near_duplicates_within_one_batch_keep_the_first():
+    fetcher = ArticleFetcher("test-key")
+    pipeline = build_topic_pipeline(fetcher, PassThroughAnalyzer())
+    urls = [article['url'] for article in pipeline.run(iter([CHIPS, reworded(CHIPS), ROCKETS]))]
+    assert urls == [CHIPS['url'], ROCKETS['url']]
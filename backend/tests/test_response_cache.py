@@ -0,0 +1,30 @@
+import time
+
+from response_cache import ResponseCache
+
+def test_key_collapses_whitespace_and_ignores_order():
+    assert ResponseCache.make_key({'q': '  open  ai ', 'page': 2}) == ResponseCache.make_key({'page': 2, 'q': 'open ai'})
+
+def test_key_keeps_case_of_boolean_operators():
+    assert ResponseCache.make_key({'q': 'a AND b'}) != ResponseCache.make_key({'q': 'a and b'})
+
+def test_entries_expire():
+    cache = ResponseCache(ttl_seconds=0.05, max_entries=10)
+    cache.set('k', [1])
+    assert cache.get('k') == [1]
+    time.sleep(0.1)
+    assert cache.get('k') is None
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+def test_disk_entries_survive_restart(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    ResponseCache(ttl_seconds=60, max_entries=10, disk_path=path).set('k', {'articles': []})
+    assert ResponseCache(ttl_seconds=60, max_entries=10, disk_path=path).get('k') == {'articles': []}
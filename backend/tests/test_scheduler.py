@@ -0,0 +1,61 @@
+import numpy as np
+
+import scheduler
+from models import TagRefreshState
+from scheduler import IngestionScheduler
+
+class FakeMatcher:
+    article_store = None
+
+    def create_article_text(self, title, description="", content=""):
+        return " ".join(part for part in (title, description, content) if part)
+
+    def get_embeddings_batch(self, texts):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def index_articles(self, article_ids, embeddings):
+        return len(article_ids)
+
+class FakeTagStore:
+    def embed_tags(self, tags):
+        for tag in tags:
+            tag.embedding = np.ones(4, dtype=np.float32).tobytes()
+        return True
+
+def fake_fetcher(failing):
+    class FakeFetcher:
+        def fetch_many(self, keywords, days_back=None, max_concurrency=None, errors=None):
+            results = {}
+            for keyword in keywords:
+                if keyword in failing:
+                    errors[keyword] = "boom"
+                    results[keyword] = []
+                else:
+                    results[keyword] = [{'title': f"{keyword} news", 'url': f"https://example.com/{keyword}"}]
+            return results
+    return FakeFetcher
+
+def run(session_factory, monkeypatch, failing):
+    monkeypatch.setattr(scheduler, 'NewsFetcher', fake_fetcher(failing))
+    summary = IngestionScheduler(FakeMatcher(), FakeTagStore(), session_factory=session_factory).run_once()
+    db = session_factory()
+    states = {state.tag_id: state for state in db.query(TagRefreshState)}
+    db.close()
+    return summary, states
+
+def test_all_fetches_ok(session_factory, monkeypatch):
+    summary, states = run(session_factory, monkeypatch, failing=set())
+    assert summary['status'] == 'ok' and summary['fetch_errors'] == 0
+    assert summary['new_articles'] == 2
+    assert {state.last_status for state in states.values()} == {'ok'}
+
+def test_failed_fetch_is_recorded_per_tag(session_factory, monkeypatch):
+    summary, states = run(session_factory, monkeypatch, failing={'Space'})
+    assert summary['status'] == 'partial' and summary['fetch_errors'] == 1
+    assert states[1].last_status == 'ok'
+    assert states[2].last_status == 'error' and states[2].last_error == 'boom'
+
+def test_run_where_every_fetch_failed_is_an_error(session_factory, monkeypatch):
+    summary, states = run(session_factory, monkeypatch, failing={'AI', 'Space'})
+    assert summary['status'] == 'error'
+    assert {state.last_status for state in states.values()} == {'error'}
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from semantic_matcher import SemanticMatcher
+
+def fake_encode(texts):
+    # Deterministic, nonzero vectors for any text (including the " " placeholder)
+    return np.vstack([
+        np.random.default_rng(abs(hash(text)) % (2 ** 32)).normal(size=8) + 1.0
+        for text in texts
+    ]).astype(np.float32)
+
+@pytest.fixture
+def matcher(monkeypatch):
+    matcher = SemanticMatcher(use_cache=False)
+    monkeypatch.setattr(matcher, '_encode', fake_encode)
+    return matcher
+
+def test_batch_scores_match_pairwise_cosine(matcher):
+    article_texts, tag_texts = ["a", "b", "c"], ["x", "y"]
+    matches = matcher.match_articles_to_tags(article_texts, tag_texts, threshold=-1.0)
+    assert len(matches) == 6
+    articles, tags = fake_encode(article_texts), fake_encode(tag_texts)
+    for match in matches:
+        expected = matcher.calculate_similarity(articles[match['article_index']], tags[match['tag_index']])
+        assert match['similarity_score'] == pytest.approx(expected, abs=1e-5)
+
+def test_empty_article_scores_zero(matcher):
+    matches = matcher.match_articles_to_tags(["", "   ", "real text"], ["tag one", "tag two"], threshold=-1.0)
+    scores = {(m['article_index'], m['tag_index']): m['similarity_score'] for m in matches}
+    for article in (0, 1):
+        for tag in (0, 1):
+            assert scores[(article, tag)] == 0.0
+    assert scores[(2, 0)] != 0.0
+
+def test_empty_article_does_not_match(matcher):
+    assert matcher.match_article_to_tags("", ["tag one"], threshold=0.01) == []
+
+def test_empty_batch_through_the_batcher():
+    matcher = SemanticMatcher(use_cache=False, use_batching=True)
+    matcher.batcher.encode = fake_encode
+    assert matcher.get_embeddings_batch([]).shape == (0, 8)
@@ -0,0 +1,72 @@
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from database import get_read_db
+from models import Article, ArticleTag
+
+# 12 links to tag 1 with heavily tied scores, plus one to tag 2
+SCORES = [0.9, 0.7, 0.7, 0.7, 0.7, 0.5, 0.5, 0.5, 0.3, 0.3, 0.2, 0.1]
+
+@pytest.fixture
+def client(session_factory):
+    db = session_factory()
+    for i, score in enumerate(SCORES):
+        db.add(Article(id=i + 1, title=f"Article {i}", url=f"https://news.example.com/{i}"))
+        db.add(ArticleTag(article_id=i + 1, tag_id=1, relevance_score=score))
+    db.add(ArticleTag(article_id=1, tag_id=2, relevance_score=0.8))
+    db.commit()
+    db.close()
+
+    def read_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    main.app.dependency_overrides[get_read_db] = read_db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.pop(get_read_db, None)
+
+def walk(client, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get("/tags/1/articles", params=dict(params, **({'cursor': cursor} if cursor else {})))
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body['articles'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 12, 50])
+def test_pages_cover_every_link_once_in_order(client, limit):
+    pages = walk(client, limit=limit)
+    articles = [article for page in pages for article in page]
+    assert sorted(article['id'] for article in articles) == list(range(1, 13))
+    assert [article['relevance_score'] for article in articles] == sorted(SCORES, reverse=True)
+    assert all(len(page) == limit for page in pages[:-1])
+    assert len(pages) == max(1, -(-len(SCORES) // limit))
+
+def test_min_score_is_respected_on_every_page(client):
+    pages = walk(client, limit=2, min_score=0.5)
+    scores = [article['relevance_score'] for page in pages for article in page]
+    assert scores == [score for score in sorted(SCORES, reverse=True) if score >= 0.5]
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b"0.5").decode(),
+    base64.urlsafe_b64encode(b"high:3").decode(),
+    base64.urlsafe_b64encode(b"0.5:3:1").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe:1").decode(),
+])
+def test_malformed_cursor_is_a_bad_request(client, cursor):
+    response = client.get("/tags/1/articles", params={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Invalid cursor"
+
+def test_unknown_tag_is_not_found(client):
+    assert client.get("/tags/99/articles").status_code == 404
@@ -0,0 +1,92 @@
+import numpy as np
+
+from models import Tag
+from semantic_matcher import SemanticMatcher
+from tag_embeddings import TagEmbeddingStore
+
+def matcher_on(backend, onnx_file=None, value=1.0):
+    matcher = SemanticMatcher(backend=backend, onnx_file=onnx_file, use_cache=False)
+    matcher._encode = lambda texts: np.full((len(texts), 4), value, dtype=np.float32)
+    return matcher
+
+def test_tag_embedding_is_reused_for_the_same_text():
+    store = TagEmbeddingStore(matcher_on('torch'))
+    tag = Tag(tag_name='AI', keywords=['llm'])
+    assert store.embed_tags([tag])
+    assert not store.embed_tags([tag])
+    tag.keywords = ['llm', 'agents']
+    assert store.embed_tags([tag])
+
+def test_switching_backend_or_onnx_file_reembeds_tags():
+    tag = Tag(tag_name='AI', keywords=['llm'])
+    TagEmbeddingStore(matcher_on('torch', value=1.0)).embed_tags([tag])
+
+    assert TagEmbeddingStore(matcher_on('onnx', value=2.0)).embed_tags([tag])
+    assert np.frombuffer(tag.embedding, dtype=np.float32)[0] == 2.0
+    assert TagEmbeddingStore(matcher_on('onnx', 'onnx/model_O4.onnx', value=3.0)).embed_tags([tag])
+    assert TagEmbeddingStore(matcher_on('int8', value=4.0)).embed_tags([tag])
+    assert np.frombuffer(tag.embedding, dtype=np.float32)[0] == 4.0
+
+def text_matcher():
+    """Matcher whose embeddings depend on the text, counting encoded texts"""
+    matcher = matcher_on('torch')
+    matcher.encoded = []
+
+    def encode(texts):
+        matcher.encoded.extend(texts)
+        return np.array([[len(text), 1, 0, 0] for text in texts], dtype=np.float32)
+
+    matcher._encode = encode
+    return matcher
+
+def test_user_matrix_is_cached_until_a_tag_edit_commits(session_factory):
+    store = TagEmbeddingStore(text_matcher())
+    db = session_factory()
+    tag_ids, matrix = store.user_matrix(db, 1)
+    assert tag_ids == [1, 2]
+    assert store.user_matrix(db, 1)[1] is matrix
+    assert store.matcher.encoded == ['AI', 'Space']
+
+    other = session_factory()
+    tag = other.get(Tag, 1)
+    tag.tag_name = 'Artificial Intelligence'
+    other.flush()
+    assert 1 in store._matrices  # flushed, not committed
+    other.commit()
+    other.close()
+    assert 1 not in store._matrices
+
+    tag_ids, edited = store.user_matrix(db, 1)
+    assert tag_ids == [1, 2]
+    assert not np.allclose(edited[0], matrix[0])
+    assert store.matcher.encoded[-1] == 'Artificial Intelligence'
+    db.close()
+
+def test_user_matrix_notices_edits_made_elsewhere(session_factory):
+    store = TagEmbeddingStore(text_matcher())
+    db = session_factory()
+    _, matrix = store.user_matrix(db, 1)
+
+    # Another process: no ORM events reach this store
+    with session_factory().connection() as connection:
+        connection.execute(Tag.__table__.update().where(Tag.id == 2).values(tag_name='Space exploration'))
+        connection.execute(Tag.__table__.insert().values(id=3, user_id=1, tag_name='Climate'))
+        connection.commit()
+
+    db.expire_all()
+    tag_ids, edited = store.user_matrix(db, 1)
+    assert tag_ids == [1, 2, 3]
+    assert np.allclose(edited[0], matrix[0])
+    assert not np.allclose(edited[1], matrix[1])
+    assert store.matcher.encoded[-2:] == ['Space exploration', 'Climate']
+    db.close()
+
+def test_deleting_a_tag_invalidates_its_user(session_factory):
+    store = TagEmbeddingStore(text_matcher())
+    db = session_factory()
+    store.user_matrix(db, 1)
+    db.delete(db.get(Tag, 2))
+    db.commit()
+    assert 1 not in store._matrices
+    assert store.user_matrix(db, 1)[0] == [1]
+    db.close()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from ai_pipeline.vectors import l2_normalize
+from embedding_store import MemmapEmbeddingStore
+from vector_index import IVFIndex
+
+def clustered_vectors(n, dim=32, n_topics=40, seed=0):
+    """Random unit vectors grouped around topics, like article embeddings"""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim))
+    vectors = topics[rng.integers(0, n_topics, n)] + 0.5 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+def brute_force(vectors, query, k):
+    scores = vectors @ (query / np.linalg.norm(query))
+    return set(np.argsort(-scores)[:k].tolist())
+
+def recall_at_k(index, vectors, queries, k=10):
+    hits = 0
+    for query in queries:
+        found = {item_id for item_id, _ in index.search(query, k)}
+        hits += len(found & brute_force(vectors, query, k))
+    return hits / (k * len(queries))
+
+def test_exact_before_training():
+    vectors = clustered_vectors(500)
+    index = IVFIndex(train_threshold=1000)
+    index.add(list(range(500)), vectors)
+    assert index.centroids is None
+    assert recall_at_k(index, vectors, clustered_vectors(20, seed=1)) == 1.0
+
+def test_scores_are_cosine_similarities():
+    vectors = clustered_vectors(100)
+    index = IVFIndex()
+    index.add(list(range(100)), vectors * 3.0)  # scale is ignored
+    item_id, score = index.search(vectors[7], k=1)[0]
+    assert item_id == 7 and score == pytest.approx(1.0, abs=1e-5)
+
+def test_trained_recall_against_brute_force():
+    vectors = clustered_vectors(8000)
+    queries = clustered_vectors(100, seed=1)
+    index = IVFIndex(n_probe=8, train_threshold=2048)
+    for start in range(0, len(vectors), 1000):
+        index.add(list(range(start, start + 1000)), vectors[start:start + 1000])
+    assert index.centroids is not None
+    assert recall_at_k(index, vectors, queries) >= 0.9
+
+    # Probing every list is exact again
+    index.n_probe = len(index.centroids)
+    assert recall_at_k(index, vectors, queries) == 1.0
+
+def test_store_backed_index_keeps_no_vectors_and_matches_brute_force(tmp_path):
+    vectors = clustered_vectors(8000)
+    queries = clustered_vectors(100, seed=1)
+    store = MemmapEmbeddingStore(str(tmp_path / "store"))
+    index = IVFIndex(n_probe=8, train_threshold=2048, store=store)
+    for start in range(0, len(vectors), 1000):
+        ids = list(range(start, start + 1000))
+        store.append(ids, vectors[start:start + 1000])
+        index.add(ids, vectors[start:start + 1000])
+
+    assert index.centroids is not None
+    assert all(list_vectors is None for _, list_vectors in index._lists.values())
+    assert recall_at_k(index, vectors, queries) >= 0.9
+    item_id, score = index.search(vectors[7], k=1)[0]
+    assert item_id == 7 and score == pytest.approx(1.0, abs=1e-5)
+
+def test_retrains_when_size_doubles():
+    vectors = clustered_vectors(5000)
+    index = IVFIndex(train_threshold=1000)
+    index.add(list(range(1000)), vectors[:1000])
+    first_lists = len(index.centroids)
+    index.add(list(range(1000, 1999)), vectors[1000:1999])
+    assert len(index.centroids) == first_lists  # not doubled yet
+    index.add([1999], vectors[1999:2000])
+    assert len(index.centroids) > first_lists
+    assert index._trained_size == 2000
+
+def test_duplicate_ids_are_skipped():
+    vectors = clustered_vectors(10)
+    index = IVFIndex()
+    assert index.add(list(range(10)), vectors) == 10
+    assert index.add([3, 4, 10], vectors[:3]) == 1
+    assert len(index) == 11
+
+def test_l2_normalize_keeps_zero_rows_zero():
+    vectors = l2_normalize(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert vectors.dtype == np.float32 and vectors.flags['C_CONTIGUOUS']
+    assert np.allclose(vectors, [[0.6, 0.8], [0.0, 0.0]])
+    assert l2_normalize(np.array([3.0, 4.0])).shape == (1, 2)
@@ -0,0 +1,171 @@
+# vector_index.py
+
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from ai_pipeline.vectors import l2_normalize
+from embedding_store import RESCORE_FACTOR, MemmapEmbeddingStore
+
+# Rows scored per matrix product when assigning vectors to lists
+ASSIGN_CHUNK_SIZE = 8192
+
+def _spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=n_clusters)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random points so no list goes unused
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = l2_normalize(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index over unit vectors (cosine similarity),
+    using an inverted file: vectors are bucketed by their nearest k-means
+    centroid, and a query only scans the n_probe closest buckets.
+
+    Until train_threshold vectors have been added the index does exact search.
+    After that it trains itself, and retrains whenever it has doubled in size
+    since the last training, so the lists stay balanced as articles stream in.
+
+    With a MemmapEmbeddingStore the lists hold ids only. Candidates are
+    scored on the store's quantized rows and the best k * rescore_factor
+    rescored at float32 (MemmapEmbeddingStore.search), so no float32 copy of
+    the corpus is kept in RAM. Every id added must already be in the store.
+    """
+
+    def __init__(
+        self,
+        n_probe: int = 8,
+        train_threshold: int = 2048,
+        sample_size: int = 50000,
+        store: Optional[MemmapEmbeddingStore] = None,
+        rescore_factor: int = RESCORE_FACTOR
+    ):
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold
+        self.sample_size = sample_size
+        self.store = store
+        self.rescore_factor = rescore_factor
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: Dict[int, Tuple[np.ndarray, Optional[np.ndarray]]] = {}  # list -> (ids, vectors or None with a store)
+        self._known_ids = set()
+        self._trained_size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._known_ids)
+
+    def add(self, ids: List[int], vectors: np.ndarray) -> int:
+        """Insert vectors (skipping ids already indexed). Returns how many were added."""
+        if len(ids) == 0:
+            return 0
+        vectors = l2_normalize(vectors)
+        with self._lock:
+            keep = []
+            for i, item_id in enumerate(ids):
+                if item_id not in self._known_ids:
+                    self._known_ids.add(item_id)
+                    keep.append(i)
+            if not keep:
+                return 0
+            new_ids = np.asarray(ids, dtype=np.int64)[keep]
+            self._extend(new_ids, vectors[keep], self._assign(vectors[keep]))
+
+            size = len(self._known_ids)
+            if (self.centroids is None and size >= self.train_threshold) or (
+                self.centroids is not None and size >= 2 * self._trained_size
+            ):
+                self.train()
+            return len(keep)
+
+    def train(self) -> None:
+        """(Re)build centroids from a sample of the indexed vectors and reassign everything"""
+        with self._lock:
+            all_ids = self._all_ids()
+            if len(all_ids) == 0:
+                return
+            if self.store is None:
+                all_vectors = np.vstack([vectors for _, vectors in self._lists.values()])
+                vectors_at = lambda positions: all_vectors[positions]
+            else:
+                vectors_at = lambda positions: self.store.get(all_ids[positions].tolist())
+
+            n_lists = max(1, int(np.sqrt(len(all_ids))))
+            rng = np.random.default_rng(0)
+            sample = np.arange(len(all_ids))
+            if len(sample) > self.sample_size:
+                sample = rng.choice(len(sample), self.sample_size, replace=False)
+            sample_vectors = vectors_at(sample)
+            self.centroids = _spherical_kmeans(sample_vectors, min(n_lists, len(sample_vectors)))
+
+            self._lists = {}
+            if self.store is None:
+                self._extend(all_ids, all_vectors, self._assign(all_vectors))
+            else:
+                # Read back from the memmap a chunk at a time
+                positions = np.arange(len(all_ids))
+                assign = np.concatenate([
+                    self._assign(vectors_at(positions[start:start + ASSIGN_CHUNK_SIZE]))
+                    for start in range(0, len(all_ids), ASSIGN_CHUNK_SIZE)
+                ])
+                self._extend(all_ids, None, assign)
+            self._trained_size = len(all_ids)
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (id, cosine similarity) pairs for a single query vector, best first"""
+        query = l2_normalize(query)[0]
+        with self._lock:
+            if self.centroids is None:
+                candidates = [self._lists[0]] if 0 in self._lists else []
+            else:
+                n_probe = min(self.n_probe, len(self.centroids))
+                probe = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+                candidates = [self._lists[int(c)] for c in probe if int(c) in self._lists]
+        if not candidates:
+            return []
+
+        ids = np.concatenate([c[0] for c in candidates])
+        if self.store is not None:
+            return self.store.search(query, ids.tolist(), k, self.rescore_factor)
+        scores = np.concatenate([c[1] for c in candidates]) @ query
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest list of each vector (all list 0 before training)"""
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.concatenate([
+            np.argmax(vectors[start:start + ASSIGN_CHUNK_SIZE] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE)
+        ])
+
+    def _extend(self, ids: np.ndarray, vectors: Optional[np.ndarray], assign: np.ndarray) -> None:
+        for list_id in np.unique(assign):
+            mask = assign == list_id
+            list_id = int(list_id)
+            list_vectors = None if self.store is not None else vectors[mask]
+            if list_id in self._lists:
+                old_ids, old_vectors = self._lists[list_id]
+                self._lists[list_id] = (
+                    np.concatenate([old_ids, ids[mask]]),
+                    None if list_vectors is None else np.vstack([old_vectors, list_vectors])
+                )
+            else:
+                self._lists[list_id] = (ids[mask], list_vectors)
+
+    def _all_ids(self) -> np.ndarray:
+        if not self._lists:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([ids for ids, _ in self._lists.values()])
@@ -40,8 +40,11 @@ export const api = {
   deleteTag: (tagId) => apiClient.delete(`/tags/${tagId}`),  // ADD THIS
   
   // Articles
-  getArticlesForTag: (tagId, minScore = null) => {
+  getArticlesForTag: (tagId, minScore = null, cursor = null) => {
     const params = minScore ? { min_score: minScore } : {};
+    if (cursor) {
+      params.cursor = cursor;
+    }
     return apiClient.get(`/tags/${tagId}/articles`, { params });
   },
   
@@ -8,6 +8,8 @@ function TagView({ tagId }) {
   const [fetching, setFetching] = useState(false);
   const [error, setError] = useState(null);
   const [fetchResult, setFetchResult] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (tagId) {
@@ -20,7 +22,8 @@ function TagView({ tagId }) {
     setError(null);
     api.getArticlesForTag(tagId)
       .then(response => {
-        setArticles(response.data);
+        setArticles(response.data.articles);
+        setNextCursor(response.data.next_cursor);
         setLoading(false);
       })
       .catch(error => {
@@ -30,6 +33,21 @@ function TagView({ tagId }) {
       });
   };
 
+  const loadMoreArticles = () => {
+    setLoadingMore(true);
+    api.getArticlesForTag(tagId, null, nextCursor)
+      .then(response => {
+        setArticles(prev => [...prev, ...response.data.articles]);
+        setNextCursor(response.data.next_cursor);
+        setLoadingMore(false);
+      })
+      .catch(error => {
+        console.error('Error loading more articles:', error);
+        setError('Failed to load more articles. Please try again.');
+        setLoadingMore(false);
+      });
+  };
+
   const handleFetchNews = () => {
     setFetching(true);
     setError(null);
@@ -96,6 +114,15 @@ function TagView({ tagId }) {
               <ArticleCard key={article.id} article={article} />
             ))}
           </div>
+          {nextCursor && (
+            <button
+              onClick={loadMoreArticles}
+              disabled={loadingMore}
+              className="load-more-button"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </>
       )}
     </div>